@@ -0,0 +1,68 @@
+#! /usr/bin/env python
+"""
+Benchmark for building the time-indexed MIP of solvers.mip without solving it:
+time needed for the model and for writing it to a file, and size of the model.
+With --array, the model is kept in arrays, see solvers.mip_array
+
+    python mip-build.py [--tasks 500] [--resources 50] [--horizon 500] [--array]
+"""
+import getopt
+import os
+import sys
+import tempfile
+import time
+sys.path += ['../src','src']
+from pyschedule import Scenario
+from pyschedule.solvers import mip
+from pyschedule.solvers import mip_array, mip_pulp
+
+opts, _ = getopt.getopt(sys.argv[1:], 't:r:h:', ['tasks=','resources=','horizon=','array','test'])
+n_tasks = 500
+n_resources = 50
+horizon = 500
+MIP = mip_pulp.MIP
+for opt, arg in opts:
+    if opt in ('-t','--tasks'):
+        n_tasks = int(arg)
+    elif opt in ('-r','--resources'):
+        n_resources = int(arg)
+    elif opt in ('-h','--horizon'):
+        horizon = int(arg)
+    elif opt == '--array':
+        MIP = mip_array.MIP
+    elif opt == '--test':
+        n_tasks, n_resources, horizon = 50, 5, 50
+
+S = Scenario('mip_build_benchmark',horizon=horizon)
+S.Resources('R',num=n_resources)
+S.add_tasks(['T%i'%i for i in range(n_tasks)],
+            lengths=[1+i%5 for i in range(n_tasks)],
+            delay_costs=1)
+S.add_resource_reqs(range(n_tasks),
+                    [[i%n_resources,(i+1)%n_resources] for i in range(n_tasks)])
+
+model = mip.DiscreteMIP(MIP(S.summary()))
+model.scenario = S
+model.horizon = S.horizon
+start = time.perf_counter()
+model.build_mip_from_scenario()
+time_build = time.perf_counter()-start
+with tempfile.TemporaryDirectory() as tmp_dir:
+    start = time.perf_counter()
+    if MIP is mip_array.MIP:
+        path = os.path.join(tmp_dir,'model.mps')
+        model.mip.write_mps(path)
+        n_constraints = len(model.mip.row_low)
+    else:
+        path = os.path.join(tmp_dir,'model.lp')
+        model.mip.mip.writeLP(path)
+        n_constraints = len(model.mip.mip.constraints)
+    time_write = time.perf_counter()-start
+    size = os.path.getsize(path)
+
+print('tasks: %i, resources: %i, periods: %i'%(n_tasks,n_resources,horizon))
+print('variables: %i'%len(model.x))
+print('time for building the model (sec): %.2f'%time_build)
+print('constraints: %i'%n_constraints)
+print('time for writing the model (sec): %.2f'%time_write)
+print('size of the model file (MB): %.1f'%(size/1e6))
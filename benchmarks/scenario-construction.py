@@ -0,0 +1,77 @@
+#! /usr/bin/env python
+"""
+Benchmark for the construction of a large scenario: time and memory
+needed to create tasks with user-defined attributes, resource requirements
+and precedences
+
+    python scenario-construction.py [--tasks 100000]
+"""
+import getopt
+import sys
+import time
+import tracemalloc
+sys.path += ['../src','src']
+from pyschedule import Scenario
+
+opts, _ = getopt.getopt(sys.argv[1:], 't:', ['tasks=','test'])
+n_tasks = 100000
+for opt, arg in opts:
+    if opt in ('-t','--tasks'):
+        n_tasks = int(arg)
+    elif opt == '--test':
+        n_tasks = 1000
+n_resources = 10
+
+def build():
+    S = Scenario('construction_benchmark',horizon=100)
+    R = S.Resources('R',num=n_resources)
+    tasks = list()
+    for i in range(n_tasks):
+        T = S.Task('T%i'%i,length=1+i%3,delay_cost=1)
+        T['shift_type'] = i%2
+        T += R[i%n_resources] | R[(i+1)%n_resources]
+        tasks.append(T)
+    return S, tasks
+
+def build_precs(S,tasks):
+    for T, T_ in zip(tasks[:-1],tasks[1:]):
+        S += T < T_
+
+def build_bulk():
+    S = Scenario('construction_benchmark',horizon=100)
+    S.Resources('R',num=n_resources)
+    tasks = S.add_tasks(['T%i'%i for i in range(n_tasks)],
+                        lengths=[1+i%3 for i in range(n_tasks)],
+                        delay_costs=1,
+                        shift_type=[i%2 for i in range(n_tasks)])
+    S.add_resource_reqs(range(n_tasks),
+                        [[i%n_resources,(i+1)%n_resources] for i in range(n_tasks)])
+    S.add_precedences(range(n_tasks-1),range(1,n_tasks))
+    return S
+
+# timings without tracing
+start = time.perf_counter()
+S, tasks = build()
+time_tasks = time.perf_counter()-start
+start = time.perf_counter()
+build_precs(S,tasks)
+time_precs = time.perf_counter()-start
+del S, tasks
+start = time.perf_counter()
+build_bulk()
+time_bulk = time.perf_counter()-start
+
+# memory with tracing
+tracemalloc.start()
+S, tasks = build()
+memory_tasks = tracemalloc.get_traced_memory()[0]
+build_precs(S,tasks)
+memory_total = tracemalloc.get_traced_memory()[0]
+tracemalloc.stop()
+
+print('tasks: %i, resources: %i, precedences: %i'%(n_tasks,n_resources,len(S.precs_lax())))
+print('time for tasks and requirements (sec): %.2f'%time_tasks)
+print('time for precedences (sec): %.2f'%time_precs)
+print('time for bulk construction of all of the above (sec): %.2f'%time_bulk)
+print('memory per task incl. requirement (bytes): %i'%(memory_tasks/n_tasks))
+print('memory per task incl. requirement and precedence (bytes): %i'%(memory_total/n_tasks))
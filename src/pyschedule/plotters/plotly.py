@@ -46,25 +46,12 @@ def plot(scenario, hide_tasks=[], hide_resources=[],
         # and delta_t is one hour
         delta_t = timedelta(hours=1)
     
-    hide_tasks_str = [T for T in hide_tasks]
-    # get solution tasks
-    solution = scenario.solution()
-    #tasks of zero length are not plotted
-    solution = [(T,R,x,y) for (T,R,x,y) in solution if T not in hide_tasks_str]
-
-    # convert solution list to 
-    dd = []
-    
-    for s in solution:
-        if s in hide_tasks_str:
-            continue
-        task, ress, start, end = s
-        dd.append(dict(Task=task.name,
-                       Start=date_init + start * delta_t,
-                       Finish=date_init + delta_t * end,
-                       Resource=ress.name))
-
-    df = pd.DataFrame(dd)
+    solution = scenario.solution_frame(datetimes=True, start_time=date_init, steptime=delta_t)
+    solution = solution[~solution['task'].isin([str(T) for T in hide_tasks])]
+    df = pd.DataFrame(dict(Task=solution['task'].astype(str),
+                           Start=solution['start_time'],
+                           Finish=solution['end_time'],
+                           Resource=solution['resource'].astype(str)))
 
     color_data = 'Task'  # by default
     if data_type == 'Task':
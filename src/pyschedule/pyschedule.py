@@ -24,9 +24,19 @@ __doc__ = """ python package to formulate and solve resource-constrained schedul
 from collections import OrderedDict
 import copy
 import functools
+import gc
+import io
+import itertools
+import sys
 import types
-import uuid
 import warnings
+import weakref
+
+
+# source of the unique ids of all elements, these are used for hashing
+_uids = itertools.count()
+
+_name_trans = str.maketrans("-+[] ->/","________")
 
 
 def _isiterable(var):
@@ -36,6 +46,52 @@ def _isiterable(var):
     return isinstance(var, (list, set, tuple, _List))
 
 
+def _pause_gc(method):
+    """
+    Pause the cyclic garbage collector while method runs. Bulk methods
+    create many objects but no garbage, so collecting only costs time
+    """
+    @functools.wraps(method)
+    def wrapper(*args,**kwargs):
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return method(*args,**kwargs)
+        finally:
+            if enabled:
+                gc.enable()
+    return wrapper
+
+
+def _column(values,n=None):
+    """
+    Turns a column, e.g. a list, numpy array or pandas series, into a list
+    of python objects. A scalar is repeated n times
+    """
+    if hasattr(values,'tolist'):
+        values = values.tolist()
+    if n is None:
+        return list(values)
+    if not isinstance(values,(list,tuple)):
+        return [values]*n
+    if len(values) != n:
+        raise Exception('ERROR: column %s does not have length %i'%(str(values),n))
+    return list(values)
+
+
+def _key(el):
+    """
+    Structural key of el for elements that provide one (constraints,
+    slices and affines). Tasks and resources are identified by their
+    names, which are unique within a scenario
+    """
+    if hasattr(el,'_key'):
+        return el._key()
+    if isinstance(el,_SchedElement):
+        return el.name
+    return el
+
+
 def alt(*args):
     """
     Method to reduce the given elements with the or-operator
@@ -47,17 +103,18 @@ def alt(*args):
 
 
 class _SchedElement:
+    __slots__ = ()
+
     def __init__(self, name=''):
         if not isinstance(name, str):
             raise Exception('Name %s is not a string'%str(name))
         if 'start' in name or 'end' in name:
             raise Exception('ERROR: avoid the substring "start" and "end" in any names, this will cause problems with solvers')
-        trans = str.maketrans("-+[] ->/","________")
-        if name.translate(trans) != name:
+        if name.translate(_name_trans) != name:
             raise Exception('ERROR: name %s contains one of the following characters: -+[] ->/'%name)
         self.name = name
         # the unique id of each _SchedElement. This is uses for hashing
-        self._uid = uuid.uuid4().int
+        self._uid = next(_uids)
 
     def __str__(self):
         return str(self.name)
@@ -69,21 +126,153 @@ class _SchedElement:
         return self._uid
 
 
+# number of forks in use, elements only check for forks which share them
+# when they are changed while this is positive, see Scenario.fork
+_sharing = [0]
+_untracked = frozenset(['name','_uid','_scenarios','_base','_pending'])
+
+
+def _setattr_shared(self,attr,value):
+    if attr not in _untracked:
+        self._before_write()
+        if self._pending:
+            object.__setattr__(self,'_pending',self._pending & ~self._state_bits().get(attr,0))
+    object.__setattr__(self,attr,value)
+
+
+def _acquire():
+    _sharing[0] += 1
+    if _sharing[0] == 1:
+        _SlottedSchedElement.__setattr__ = _setattr_shared
+
+
+def _release(views):
+    # views which outlive their fork keep their state too
+    for ref in views:
+        view = ref()
+        if view is not None:
+            view._complete()
+    _sharing[0] -= 1
+    if not _sharing[0]:
+        del _SlottedSchedElement.__setattr__
+
+
+class _SlottedSchedElement(_SchedElement):
+    """
+    A _SchedElement which keeps its core fields in slots. All other attributes,
+    e.g. user-defined ones like T['shift_type'], are kept in a side table, the
+    instance dict, which is only created when the first such attribute is set
+    """
+    __slots__ = ('name','_uid','_scenarios','_base','_pending','__dict__','__weakref__')
+    # slots which are not part of the state for pickling and copying
+    _transient = ('_scenarios','_base','_pending')
+
+    def __init__(self, name=''):
+        self._scenarios = () # weak references to the scenarios which contain this element
+        self._base = None # the element a view in a fork reads its state from, see Scenario.fork
+        self._pending = 0 # bits of the state slots which a view has not read yet
+        super().__init__(name)
+
+    @classmethod
+    def _state_slots(cls):
+        if '_state_slots_' not in cls.__dict__:
+            cls._state_slots_ = tuple( attr for cls_ in cls.__mro__ for attr in cls_.__dict__.get('__slots__',())
+                                       if attr not in ('__dict__','__weakref__') and attr not in cls._transient )
+        return cls._state_slots_
+
+    @classmethod
+    def _state_bits(cls):
+        if '_state_bits_' not in cls.__dict__:
+            cls._state_bits_ = { attr : 1 << i for i,attr in enumerate(cls._state_slots()) }
+        return cls._state_bits_
+
+    def __eq__(self,other):
+        # views in forks are the same elements as the ones they were created from
+        if isinstance(other,_SlottedSchedElement):
+            return self._uid == other._uid
+        return NotImplemented
+
+    __hash__ = _SchedElement.__hash__
+
+    def __getattr__(self,attr):
+        # only views in forks have unset slots, these are read from the element
+        # the view was created from when they are needed, see Scenario.fork
+        bit = self._state_bits().get(attr,0) if not attr.startswith('__') else 0
+        if not bit or not self._pending & bit:
+            raise AttributeError("'%s' object has no attribute '%s'"%(type(self).__name__,attr))
+        value = getattr(self._base,attr)
+        if isinstance(value,(list,dict,set)):
+            S = self._scenarios[0]() if self._scenarios else None
+            value = S._map_state(attr,value) if S is not None else copy.copy(value)
+        object.__setattr__(self,attr,value)
+        object.__setattr__(self,'_pending',self._pending & ~bit)
+        return value
+
+    def _complete(self,base=None):
+        """
+        Reads all state which this view still shares with the element it was
+        created from, or only if this is base
+        """
+        if self._base is None or (base is not None and self._base is not base):
+            return
+        pending, base_ = self._pending, self._base
+        set_ = object.__setattr__
+        if pending:
+            S = self._scenarios[0]() if self._scenarios else None
+            bits = self._state_bits()
+            for attr in self._state_slots():
+                if pending & bits[attr]:
+                    value = getattr(base_,attr)
+                    if isinstance(value,(list,dict,set)):
+                        value = S._map_state(attr,value) if S is not None else copy.copy(value)
+                    set_(self,attr,value)
+        set_(self,'_pending',0)
+        set_(self,'_base',None)
+
+    def _before_write(self):
+        """
+        Lets the forks which share this element keep its state before it is
+        changed, see Scenario.fork
+        """
+        for ref in self._scenarios:
+            S = ref()
+            if S is not None and S._forks:
+                for F in S._all_forks():
+                    F._protect(self)
+
+    def __getstate__(self):
+        state = { attr : getattr(self,attr) for attr in self._state_slots() }
+        state.update(self.__dict__)
+        return state
+
+    def __copy__(self):
+        new = type(self).__new__(type(self))
+        new.__setstate__(self.__getstate__())
+        return new
+
+    def __setstate__(self, state):
+        for attr in state:
+            object.__setattr__(self,attr,state[attr])
+        object.__setattr__(self,'_scenarios',())
+        object.__setattr__(self,'_base',None)
+        object.__setattr__(self,'_pending',0)
+
+
 class _SchedElementAffine:
+    __slots__ = ('map','map_obj','affine_operator','_uid')
+
     def __init__(self,unknown=None,affine_operator='+'):
-        self.map = OrderedDict()
         # map_obj is for the case that the coefficient is e.g. a resource with a coefficient
         # then the resource will be saved in map_obj
-        self.map_obj = OrderedDict()
         self.affine_operator = affine_operator
         if isinstance(unknown,type(self)):
-            self.map.update(unknown.map)
-            self.map_obj.update(unknown.map)
+            self.map = dict(unknown.map)
+            self.map_obj = dict(unknown.map_obj)
         else:
-            self.map[unknown] = 1
-            self.map_obj[unknown] = None
+            self.map = { unknown : 1 }
+            self.map_obj = { unknown : None }
         # unique id, used for hash
-        self._uid = uuid.uuid4().int
+        self._uid = next(_uids)
 
     def __getitem__(self,key):
         return self.map[key]
@@ -146,12 +335,14 @@ class _SchedElementAffine:
         '''
         new = type(self)(self)
         new.affine_operator = self.affine_operator
-        for key in self:
-            new[key] = self[key]
-        for key in self.map_obj:
-            new.map_obj[key] = self.map_obj[key]
         return new
 
+    def _key(self):
+        """
+        Structural key, affines with equal keys are equal
+        """
+        return tuple((_key(key),self.map[key],_key(self.map_obj.get(key))) for key in self.map)
+
     def __str__(self):
         def format_coeff(key):
             if self[key] != 1:
@@ -238,17 +429,80 @@ class _List(list):
         return super(_List, self).__getitem__(key)
 
 
+class _PrecedenceGraph:
+    """
+    Graph of the lax and tight precedences of a scenario on task names. Each
+    arc keeps the keys of its precedences, the topological order is cached
+    """
+
+    def __init__(self,names=()):
+        self.succ = OrderedDict( (name,OrderedDict()) for name in names )
+        self.pred = { name : OrderedDict() for name in names }
+        self._order = None
+
+    def add_node(self,name):
+        if name not in self.succ:
+            self.succ[name] = OrderedDict()
+            self.pred[name] = OrderedDict()
+            self._order = None
+
+    def add(self,key,left,right):
+        self.add_node(left)
+        self.add_node(right)
+        if right not in self.succ[left]:
+            self.succ[left][right] = list()
+            self.pred[right][left] = None
+            self._order = None
+        self.succ[left][right].append(key)
+
+    def remove(self,key,left,right):
+        keys = self.succ[left][right]
+        keys.remove(key)
+        if not keys:
+            del self.succ[left][right]
+            del self.pred[right][left]
+            self._order = None
+
+    def order(self):
+        """
+        returns the names in topological order and the names which are not
+        in this order since they are on or behind cycles
+        """
+        if self._order is None:
+            degree = { name : len(self.pred[name]) for name in self.succ }
+            order = [ name for name in self.succ if not degree[name] ]
+            for name in order:
+                for name_ in self.succ[name]:
+                    degree[name_] -= 1
+                    if not degree[name_]:
+                        order.append(name_)
+            rest = [ name for name in self.succ if degree[name] ]
+            self._order = (order,rest)
+        return self._order
+
+
 class Scenario(_SchedElement):
     """
     The base scenario class
     """
+    _forked = False # whether this scenario was created by fork
+    _forks = () # forks of this scenario
+    _shared = frozenset() # names of tasks and resources shared with the scenario this one is forked from
+    _unmapped = False # whether constraints may refer to shared tasks and resources
+    _cow = frozenset() # containers shared with forks
+    _cow_resource_tasks = frozenset() # resources whose task lists in _resource_tasks are shared with forks
+    _precedence_graph = None # cache of _get_precedence_graph
+
     def __init__(self,name='Unnamed',horizon=None,start_time=None,
                  end_time=None,steptime=None, duration=None):
         super().__init__(name)
         self.horizon = horizon
         self._tasks = OrderedDict() #tasks
         self._resources = OrderedDict() #resources
-        self._constraints = []
+        self._constraints = OrderedDict() #constraints indexed by their structural key
+        self._constraints_by_class = dict() #same as above but bucketed by constraint class
+        self._resource_tasks = dict() #resource to the tasks which have it in some requirement
+        self._period_masks = dict() #cache of get_period_mask
 
         # start and end times, should be datetime
         self.start_time = start_time
@@ -311,14 +565,181 @@ class Scenario(_SchedElement):
             self.add_task(T)
         return tasks
 
+    @_pause_gc
+    def add_tasks(self,names,lengths=1,periods=None,groups=None,schedule_costs=None,delay_costs=None,**attributes):
+        """
+        Adds many tasks at once, this is much faster than calling Task for each task
+        names: column of unique task names
+        lengths, periods, groups, schedule_costs, delay_costs: columns with the
+            parameters of Task, a scalar is used for all tasks
+        attributes: further columns which are set as task attributes
+        Columns can be lists, numpy arrays or pandas series. If names is a pandas
+        DataFrame, then its column name is used for the names, and the columns
+        length, periods, group, schedule_cost, delay_cost and all others as above
+        Returns the list of new tasks
+        """
+        if hasattr(names,'columns'):
+            columns = OrderedDict([ (col,names[col]) for col in names.columns ])
+            names = columns.pop('name')
+            lengths = columns.pop('length',lengths)
+            periods = columns.pop('periods',periods)
+            groups = columns.pop('group',groups)
+            schedule_costs = columns.pop('schedule_cost',schedule_costs)
+            delay_costs = columns.pop('delay_cost',delay_costs)
+            columns.update(attributes)
+            attributes = columns
+        names = _column(names)
+        n = len(names)
+        if len(set(names)) != n:
+            raise NameError('ERROR: task names are not unique')
+        for name in names:
+            if name in self._tasks or name in self._resources:
+                raise NameError('ERROR: resource or task with name %s already contained in scenario'%str(name))
+        lengths = _column(lengths,n)
+        if periods is not None:
+            periods = _column(periods)
+            # a single list of periods is used for all tasks, otherwise each
+            # entry is None or the periods of one task, e.g. a list or a range
+            if all( p is not None and (isinstance(p,str) or not hasattr(p,'__iter__')) for p in periods ):
+                periods = [periods]*n
+            else:
+                # missing entries, e.g. NaN in a pandas column, are None, and single
+                # periods are passed as given like in Task
+                periods = _column(periods,n)
+                periods = [ _column(p) if hasattr(p,'__iter__') and not isinstance(p,str) else
+                            None if p is None or p != p else p for p in periods ]
+        periods = _column(periods,n)
+        groups = _column(groups,n)
+        schedule_costs = _column(schedule_costs,n)
+        delay_costs = _column(delay_costs,n)
+        attributes = OrderedDict([ (attr,_column(attributes[attr],n)) for attr in attributes ])
+
+        self._write('_tasks')
+        tasks = _List()
+        ref = weakref.ref(self)
+        for i in range(n):
+            T = Task(name=names[i],length=lengths[i],periods=periods[i],group=groups[i],
+                     schedule_cost=schedule_costs[i],delay_cost=delay_costs[i])
+            for attr in attributes:
+                setattr(T,attr,attributes[attr][i])
+            # new tasks have no requirements yet, so registering is trivial
+            T._scenarios = [ref]
+            self._tasks[T.name] = T
+            tasks.append(T)
+        if self._precedence_graph is not None:
+            for T in tasks:
+                self._precedence_graph.add_node(T.name)
+        return tasks
+
+    def _lookup(self,column,attr):
+        """
+        Returns the elements for the given column of elements, names or
+        integer positions in the container attr, i.e. _tasks or _resources
+        """
+        column = _column(column)
+        elements = getattr(self,attr)
+        values = None
+        result = list()
+        for el in column:
+            if isinstance(el,str):
+                if el not in elements:
+                    raise Exception('ERROR: task or resource with name %s is not contained in scenario %s'%
+                                (str(el),str(self.name)))
+                el = elements[el]
+            elif isinstance(el,int):
+                if values is None:
+                    values = list(elements.values())
+                el = values[el]
+            elif elements.get(el.name) is not el and \
+                 not (self._forked and elements.get(el.name) == el):
+                raise Exception('ERROR: %s is not contained in scenario %s'%(str(el),str(self.name)))
+            result.append(el)
+        if self._forked:
+            # shared elements are handed out as views, see fork
+            result = [ self._map(el) for el in result ]
+        return result
+
+    @_pause_gc
+    def add_resource_reqs(self,tasks,alt_groups):
+        """
+        Adds many resource requirements at once, this is much faster than T += R1|R2
+        tasks: column of tasks, task names or positions in tasks()
+        alt_groups: column of the same length, each entry is a list of resources,
+            resource names or positions in resources(). Each task requires one of
+            the resources in its entry, a single resource is also possible
+        Columns can be lists, numpy arrays or pandas series
+        """
+        tasks = self._lookup(tasks,'_tasks')
+        alt_groups = [ group if isinstance(group,(list,tuple)) else [group]
+                       for group in _column(alt_groups,len(tasks)) ]
+        # look up all resources at once
+        resources = self._lookup([ R for group in alt_groups for R in group ],'_resources')
+        i = 0
+        for T, group in zip(tasks,alt_groups):
+            RA = _ResourceAffine(resources[i])
+            for R in resources[i+1:i+len(group)]:
+                RA[R] = 1
+            i += len(group)
+            if _sharing[0]:
+                T._before_write()
+            T.resources_req.append(RA)
+            T._link_resources_req(RA)
+
+    @_pause_gc
+    def add_precedences(self,left,right,offsets=0,kind='lax'):
+        """
+        Adds many precedences at once, this is much faster than S += T1 + offset < T2
+        left, right: columns of tasks, task names or positions in tasks()
+        offsets: column of offsets, a scalar is used for all precedences
+        kind: lax (<), tight (<=) or cond (<<)
+        Columns can be lists, numpy arrays or pandas series
+        """
+        kinds = {'lax':PrecedenceLax, 'tight':PrecedenceTight, 'cond':PrecedenceCond}
+        if kind not in kinds:
+            raise Exception('ERROR: unknown precedence kind %s'%str(kind))
+        left = self._lookup(left,'_tasks')
+        right = self._lookup(right,'_tasks')
+        if len(left) != len(right):
+            raise Exception('ERROR: left and right tasks have different lengths')
+        offsets = _column(offsets,len(left))
+        for T, T_, offset in zip(left,right,offsets):
+            C = kinds[kind](task_left=T,resource_left=None,task_right=T_,resource_right=None,offset=offset)
+            key = C._key()
+            if key not in self._constraints:
+                self._index_constraint(key,C)
+
+    @_pause_gc
+    def add_bounds(self,tasks,bounds,kind='low'):
+        """
+        Adds many bounds at once, this is much faster than S += T > bound
+        tasks: column of tasks, task names or positions in tasks()
+        bounds: column of bounds, a scalar is used for all tasks
+        kind: low (>), up (<), low_tight (>=) or up_tight (<=)
+        Columns can be lists, numpy arrays or pandas series
+        """
+        kinds = {'low':BoundLow, 'up':BoundUp, 'low_tight':BoundLowTight, 'up_tight':BoundUpTight}
+        if kind not in kinds:
+            raise Exception('ERROR: unknown bound kind %s'%str(kind))
+        tasks = self._lookup(tasks,'_tasks')
+        bounds = _column(bounds,len(tasks))
+        for T, bound in zip(tasks,bounds):
+            C = kinds[kind](task=T,bound=bound)
+            key = C._key()
+            if key not in self._constraints:
+                self._index_constraint(key,C)
+
     def tasks(self,resource=None):
         """
         Returns all tasks in scenario
         """
         if resource is None:
+            if self._shared:
+                self._view_all('_tasks')
             return list(self._tasks.values())
-        else:
-            return list({ T for T in self.tasks() for RA in T.resources_req if resource in RA })
+        tasks = self._resource_tasks.get(resource,())
+        if self._forked:
+            return [ self._map(T) for T in tasks ]
+        return list(tasks)
 
     def Resource(self,name,size=1,periods=None,group=None,cost_per_period=None,**kwargs):
         """
@@ -351,8 +772,12 @@ class Scenario(_SchedElement):
         Returns all resources in scenario
         """
         if task is None:
+            if self._shared:
+                self._view_all('_resources')
             return list(self._resources.values())
-        return list({ R for RA in task.resources_req for R in RA })
+        if self._forked:
+            return [ self._map(R) for R in task._resources_in_req ]
+        return list(task._resources_in_req)
 
     def resources_req_tasks(self,min_size=2):
         """
@@ -384,14 +809,85 @@ class Scenario(_SchedElement):
         solution = sorted(solution, key = lambda x: (x[2],str(x[0]),str(x[1])) )
         return solution
 
+    @_pause_gc
+    def solution_array(self,datetimes=False,start_time=None,steptime=None):
+        """
+        Returns the last computed solution as numpy structured array with fields
+        task and resource (positions in tasks() and resources()), start and end,
+        rows are sorted as in solution
+        datetimes: add fields start_time and end_time
+        start_time, steptime: used for the datetimes instead of the ones of the scenario
+        """
+        import numpy as np
+        tasks = self.tasks()
+        resources = self.resources()
+        # index by id, this avoids calling __hash__ for each row
+        resource_index = { id(R):i for i,R in enumerate(resources) }
+        task_col, resource_col, start_col, end_col = [], [], [], []
+        for i,T in enumerate(tasks):
+            start = T.start_value
+            if start is None or T.resources is None:
+                continue
+            for R in T.resources:
+                task_col.append(i)
+                resource_col.append(resource_index[id(R)])
+                start_col.append(start)
+                end_col.append(start+T.length)
+        fields = [('task',np.int64),('resource',np.int64),('start',np.int64),('end',np.int64)]
+        if datetimes:
+            start_time = self.start_time if start_time is None else start_time
+            steptime = self.steptime if steptime is None else steptime
+            if start_time is None or steptime is None:
+                raise Exception('ERROR: scenario %s has no start_time or steptime'%str(self.name))
+            fields += [('start_time','datetime64[us]'),('end_time','datetime64[us]')]
+        solution = np.empty(len(task_col),dtype=fields)
+        solution['task'] = task_col
+        solution['resource'] = resource_col
+        solution['start'] = start_col
+        solution['end'] = end_col
+        if datetimes:
+            start_time = np.datetime64(start_time,'us')
+            steptime = np.timedelta64(steptime,'us')
+            solution['start_time'] = start_time + solution['start']*steptime
+            solution['end_time'] = start_time + solution['end']*steptime
+        # sort according to start and name
+        def rank(elements):
+            order = np.argsort(np.array([ str(el) for el in elements ]),kind='stable')
+            rank = np.empty(len(elements),dtype=np.int64)
+            rank[order] = np.arange(len(elements))
+            return rank
+        task_rank = rank(tasks)
+        resource_rank = rank(resources)
+        order = np.lexsort((resource_rank[solution['resource']],task_rank[solution['task']],solution['start']))
+        return solution[order]
+
+    def solution_frame(self,datetimes=False,start_time=None,steptime=None):
+        """
+        Returns the last computed solution as pandas DataFrame, see solution_array.
+        Columns task and resource are categorical with the positions as codes and the names as categories
+        """
+        import pandas as pd
+        solution = self.solution_array(datetimes=datetimes,start_time=start_time,steptime=steptime)
+        df = pd.DataFrame(solution)
+        df['task'] = pd.Categorical.from_codes(solution['task'],categories=[ T.name for T in self.tasks() ])
+        df['resource'] = pd.Categorical.from_codes(solution['resource'],
+                                                   categories=[ R.name for R in self.resources() ])
+        return df
+
     def objective(self):
         """
         Returns a representation of all objectives
         """
         tasks_objective = [T*T['delay_cost'] for T in self.tasks() if 'delay_cost' in T]
-        if tasks_objective:
-            return functools.reduce(lambda x,y:x+y,tasks_objective)
-        return None
+        if not tasks_objective:
+            return None
+        # sum up in place, adding the affines one by one would copy the sum each time
+        objective = tasks_objective[0].copy()
+        for TA in tasks_objective[1:]:
+            for T in TA:
+                objective.map[T] = TA[T]
+                objective.map_obj[T] = TA.map_obj[T]
+        return objective
 
     def objective_value(self):
         """
@@ -414,7 +910,9 @@ class Scenario(_SchedElement):
         if not self.tasks():
             return
         if 'MakeSpan' in self._tasks:
-            self._constraints = [C for C in self._constraints if self._tasks['MakeSpan'] not in C.tasks()]
+            old_makespan = self._tasks['MakeSpan']
+            self._filter_constraints(lambda C: old_makespan not in C.tasks())
+            self._write('_tasks')
             del self._tasks['MakeSpan']
         tasks = self.tasks() # save tasks before adding makespan
         makespan = self.Task('MakeSpan')
@@ -449,10 +947,28 @@ class Scenario(_SchedElement):
         for T in self.tasks():
             T.delay_cost = None
 
+    def clear_constraints(self):
+        """
+        Removes all constraints
+        """
+        self._cow = self._cow - {'_constraints','_constraints_by_class'}
+        self._unmapped = False
+        self._constraints = OrderedDict()
+        self._constraints_by_class = dict()
+        self._precedence_graph = None
+
     def constraints(self,constraint_class=None):
+        if self._unmapped:
+            self._map_constraints()
         if constraint_class is None:
-            return self._constraints
-        return [C for C in self._constraints if isinstance(C,constraint_class)]
+            return list(self._constraints.values())
+        classes = [ cls for cls in self._constraints_by_class if issubclass(cls,constraint_class) ]
+        if not classes:
+            return []
+        if len(classes) == 1:
+            return list(self._constraints_by_class[classes[0]].values())
+        # several buckets, filter to keep the order in which constraints were added
+        return [C for C in self._constraints.values() if isinstance(C,constraint_class)]
 
     def precs_lax(self):
         return self.constraints(PrecedenceLax)
@@ -485,27 +1001,320 @@ class Scenario(_SchedElement):
         for resource in constraint.resources():
             if resource not in self:
                 raise Exception('ERROR: resource %s is not contained in scenario %s'%(str(resource.name),str(self.name)))
-        if str(constraint) in [str(C) for C in self._constraints]:
+        key = constraint._key()
+        if key in self._constraints:
             return self
-        self._constraints.append(constraint)
+        self._index_constraint(key,constraint)
+
+    def _index_constraint(self,key,constraint):
+        if self._cow:
+            self._write('_constraints','_constraints_by_class')
+        if self._shared:
+            self._unmapped = True
+        self._constraints[key] = constraint
+        cls = type(constraint)
+        if cls not in self._constraints_by_class:
+            self._constraints_by_class[cls] = OrderedDict()
+        self._constraints_by_class[cls][key] = constraint
+        if self._precedence_graph is not None and cls in (PrecedenceLax,PrecedenceTight):
+            self._precedence_graph.add(key,constraint.task_left.name,constraint.task_right.name)
 
     def remove_constraint(self,constraint):
-        if str(constraint) not in [str(C) for C in self._constraints]:
+        key = constraint._key()
+        if key not in self._constraints:
             raise Exception('ERROR: constraint %s not contained in scenario %s'%(str(constraint),str(self.name)))
-        self._constraints = [C for C in self._constraints if str(C) != str(constraint)]
+        self._write('_constraints','_constraints_by_class')
+        constraint = self._constraints.pop(key)
+        cls = type(constraint)
+        del self._constraints_by_class[cls][key]
+        if self._precedence_graph is not None and cls in (PrecedenceLax,PrecedenceTight):
+            self._precedence_graph.remove(key,constraint.task_left.name,constraint.task_right.name)
+        if not self._constraints_by_class[cls]:
+            del self._constraints_by_class[cls]
+
+    def _filter_constraints(self,keep):
+        """
+        Only keep the constraints C with keep(C)
+        """
+        if self._unmapped:
+            self._map_constraints()
+        constraints = [ (key,C) for key,C in self._constraints.items() if keep(C) ]
+        self.clear_constraints()
+        for key,C in constraints:
+            self._index_constraint(key,C)
 
     def add_task(self,task):
         if task.name in self._tasks and task is not self._tasks[task.name]:
             raise Exception('ERROR: task with name %s already contained in scenario %s' % (str(task.name),str(self.name)))
-        elif task not in self.tasks():
+        elif task.name not in self._tasks:
+            self._write('_tasks')
             self._tasks[task.name] = task
+            self._register_task(task)
+            if self._precedence_graph is not None:
+                self._precedence_graph.add_node(task.name)
 
     def remove_task(self,task):
         if task.name in self._tasks:
+            # forks no longer learn about changes of the task via this scenario,
+            # and removed views no longer learn about changes of their base
+            for F in self._all_forks():
+                F._protect(task)
+            self._tasks[task.name]._complete()
+            self._write('_tasks')
             del self._tasks[task.name]
+            self._unregister_task(task)
+            if self._shared:
+                self._shared.discard(task.name)
+            self._period_masks.pop(task,None)
         else:
             raise Exception('ERROR: task with name %s not contained in scenario %s' % (str(task.name),str(self.name)))
-        self._constraints = [C for C in self._constraints if task not in C.tasks()]
+        self._filter_constraints(lambda C: task not in C.tasks())
+
+    def _register_task(self,task):
+        """
+        Let the task notify this scenario about changes of its resource requirements
+        """
+        task._scenarios = [ ref for ref in task._scenarios if ref() is not None ] + [weakref.ref(self)]
+        for R in task._resources_in_req:
+            self._link_task_resource(task,R)
+
+    def _unregister_resource(self,resource):
+        resource._scenarios = [ ref for ref in resource._scenarios if ref() is not None and ref() is not self ]
+
+    def _unregister_task(self,task):
+        task._scenarios = [ ref for ref in task._scenarios if ref() is not None and ref() is not self ]
+        for R in task._resources_in_req:
+            self._unlink_task_resource(task,R)
+
+    def _link_task_resource(self,task,resource):
+        if self._cow or self._cow_resource_tasks:
+            self._write_resource_tasks(resource)
+        if resource not in self._resource_tasks:
+            self._resource_tasks[resource] = OrderedDict()
+        self._resource_tasks[resource][task] = None
+
+    def _unlink_task_resource(self,task,resource):
+        tasks = self._resource_tasks.get(resource)
+        if tasks is None or task not in tasks:
+            return
+        if self._cow or self._cow_resource_tasks:
+            self._write_resource_tasks(resource)
+            tasks = self._resource_tasks[resource]
+        del tasks[task]
+        if not tasks:
+            del self._resource_tasks[resource]
+
+    def __getstate__(self):
+        if self._forked:
+            # copies do not share elements, so they only get complete views
+            self._view_all('_tasks')
+            self._view_all('_resources')
+            self._map_constraints()
+            for el in itertools.chain(self._tasks.values(),self._resources.values()):
+                el._complete()
+        state = dict(self.__dict__)
+        for attr in ('_forked','_forks','_shared','_unmapped','_affines','_views','_ref',
+                     '_cow','_cow_resource_tasks'):
+            state.pop(attr,None)
+        return state
+
+    def __setstate__(self,state):
+        self.__dict__.update(state)
+        # elements do not keep references to scenarios in their state
+        ref = weakref.ref(self)
+        for el in itertools.chain(self._tasks.values(),self._resources.values()):
+            el._scenarios = list(el._scenarios) + [ref]
+
+    def fork(self):
+        """
+        Returns a copy-on-write copy of the scenario, e.g. for what-if analysis. The fork
+        shares tasks, resources and constraints with this scenario. fork['T1'], fork.tasks()
+        and fork.resources() hand out views of the shared tasks and resources, which read
+        their state from the shared ones until either of them is changed. Changes of the
+        fork, including solutions, do not affect this scenario and vice versa
+        """
+        fork = Scenario.__new__(Scenario)
+        fork.__dict__.update(self.__dict__)
+        fork._uid = next(_uids)
+        fork._forked = True
+        fork._forks = ()
+        fork._shared = set(self._tasks)
+        fork._shared.update(self._resources)
+        fork._unmapped = True
+        fork._affines = dict()
+        fork._views = list() # weak references to the views handed out by the fork
+        fork._ref = (weakref.ref(fork),)
+        # both scenarios copy the containers before they change them
+        fork._cow = self._cow = frozenset(['_tasks','_resources','_constraints',
+                                           '_constraints_by_class','_resource_tasks'])
+        fork._cow_resource_tasks = self._cow_resource_tasks = frozenset()
+        fork._precedence_graph = None
+        fork._period_masks = dict()
+        self._forks = [ ref for ref in self._forks if ref() is not None ] + [weakref.ref(fork)]
+        _acquire()
+        weakref.finalize(fork,_release,fork._views)
+        return fork
+
+    def _all_forks(self):
+        forks = [ ref() for ref in self._forks ]
+        for F in forks:
+            if F is not None and F._forks:
+                forks.extend( ref() for ref in F._forks )
+        return [ F for F in forks if F is not None ]
+
+    def _write(self,*containers):
+        """
+        Copies the given containers if they are shared with a fork, see fork
+        """
+        for name in containers:
+            if name not in self._cow:
+                continue
+            self._cow = self._cow - {name}
+            if name == '_constraints_by_class':
+                self._constraints_by_class = { cls : OrderedDict(constraints)
+                                               for cls,constraints in self._constraints_by_class.items() }
+            elif name == '_resource_tasks':
+                # the task lists of the resources are copied separately when they change
+                self._resource_tasks = dict(self._resource_tasks)
+                self._cow_resource_tasks = set(self._resource_tasks)
+            else:
+                setattr(self,name,OrderedDict(getattr(self,name)))
+
+    def _write_resource_tasks(self,resource):
+        self._write('_resource_tasks')
+        if resource in self._cow_resource_tasks:
+            self._cow_resource_tasks.discard(resource)
+            self._resource_tasks[resource] = OrderedDict(self._resource_tasks[resource])
+
+    def _view(self,name):
+        """
+        Replaces the shared task or resource with the given name by a view, see fork.
+        The view has no state yet, it reads it from the shared element when needed
+        """
+        attr = '_tasks' if name in self._tasks else '_resources'
+        self._write(attr)
+        elements = getattr(self,attr)
+        el = elements[name]
+        view = type(el).__new__(type(el))
+        set_ = object.__setattr__
+        set_(view,'name',name)
+        set_(view,'_uid',el._uid)
+        set_(view,'_base',el)
+        set_(view,'_pending',(1 << len(view._state_slots()))-1)
+        set_(view,'_scenarios',self._ref)
+        if el.__dict__:
+            view.__dict__.update( (key,copy.copy(value) if isinstance(value,(list,dict,set)) else value)
+                                  for key,value in el.__dict__.items() )
+        self._views.append(weakref.ref(view))
+        elements[name] = view
+        self._shared.discard(name)
+        return view
+
+    @_pause_gc
+    def _view_all(self,attr):
+        for name in [ name for name in getattr(self,attr) if name in self._shared ]:
+            self._view(name)
+
+    def _protect(self,el):
+        """
+        Called before the shared element el is changed, the fork keeps its state
+        """
+        elements = self._tasks if isinstance(el,Task) else self._resources
+        el_ = elements.get(el.name)
+        if el_ is el:
+            if el.name in self._shared:
+                self._view(el.name)._complete(el)
+        elif el_ is not None and el_._uid == el._uid:
+            el_._complete(el)
+
+    def _map(self,el):
+        """
+        Returns the task, resource or affine of this scenario which corresponds to el,
+        views replace shared tasks and resources, see fork
+        """
+        if isinstance(el,_SchedElementAffine):
+            if id(el) not in self._affines:
+                el_ = type(el).__new__(type(el))
+                el_.map = { self._map(key) : el.map[key] for key in el.map }
+                el_.map_obj = { self._map(key) : self._map(el.map_obj.get(key)) for key in el.map }
+                el_.affine_operator = el.affine_operator
+                el_._uid = next(_uids)
+                # keep el alive, otherwise its id could be reused
+                self._affines[id(el)] = (el,el_)
+            return self._affines[id(el)][1]
+        if isinstance(el,Task):
+            elements = self._tasks
+        elif isinstance(el,Resource):
+            elements = self._resources
+        else:
+            return el
+        el_ = elements.get(el.name)
+        if el_ is None or el_._uid != el._uid:
+            return el
+        if el.name in self._shared:
+            return self._view(el.name)
+        return el_
+
+    def _map_state(self,attr,value):
+        """
+        Returns a copy of the list, dict or set value of attribute attr of a shared
+        element for a view of it
+        """
+        if attr in ('_resources_req','tasks_req','resources'):
+            return [ self._map(el) for el in value ]
+        if attr == '_resources_in_req':
+            return { self._map(R) : count for R,count in value.items() }
+        return copy.copy(value)
+
+    def _map_constraint(self,C):
+        """
+        Returns C or a copy of it which refers to the elements of this scenario
+        """
+        if isinstance(C,_Precedence):
+            els = (C.task_left,C.task_right,C.resource_left,C.resource_right)
+        elif isinstance(C,_Bound):
+            els = (C.task,)
+        elif isinstance(C,Capacity):
+            els = tuple( SL.resource for SL in C.SLA )
+        else:
+            return C
+        els_ = tuple( self._map(el) for el in els )
+        if all( el is el_ for el,el_ in zip(els,els_) ):
+            return C
+        C_ = copy.copy(C)
+        C_._uid = next(_uids)
+        if isinstance(C,_Precedence):
+            C_.task_left, C_.task_right, C_.resource_left, C_.resource_right = els_
+        elif isinstance(C,_Bound):
+            C_.task = els_[0]
+        else:
+            C_.SLA = C.SLA.copy()
+            C_.SLA.map, C_.SLA.map_obj = dict(), dict()
+            for SL, R in zip(C.SLA,els_):
+                SL_ = SL
+                if R is not SL.resource:
+                    SL_ = copy.copy(SL)
+                    SL_._uid = next(_uids)
+                    SL_.resource = R
+                C_.SLA.map[SL_] = C.SLA.map[SL]
+                C_.SLA.map_obj[SL_] = C.SLA.map_obj[SL]
+        return C_
+
+    @_pause_gc
+    def _map_constraints(self):
+        """
+        Replaces the constraints which refer to shared elements by copies which
+        refer to their views, the keys do not change since views keep the names
+        """
+        self._unmapped = False
+        changed = [ (key,C_) for key,C_ in ( (key,self._map_constraint(C)) for key,C in self._constraints.items() )
+                    if C_ is not self._constraints[key] ]
+        if not changed:
+            return
+        self._write('_constraints','_constraints_by_class')
+        for key,C_ in changed:
+            self._constraints[key] = C_
+            self._constraints_by_class[type(C_)][key] = C_
 
     def add_task_affine(self,task_affine):
         for task in task_affine:
@@ -518,26 +1327,296 @@ class Scenario(_SchedElement):
         if resource.name in self._resources and resource is not self._resources[resource.name]:
             raise Exception('ERROR: resource with name %s already contained in scenario %s'%
                         (str(resource.name),str(self.name)))
-        elif resource not in self.resources():
+        elif resource.name not in self._resources:
+            self._write('_resources')
             self._resources[resource.name] = resource
+            resource._scenarios = [ ref for ref in resource._scenarios if ref() is not None ] + [weakref.ref(self)]
 
     def remove_resource(self,resource):
         if resource.name in self._resources:
+            for F in self._all_forks():
+                F._protect(resource)
+            self._resources[resource.name]._complete()
+            self._write('_resources')
             del self._resources[resource.name]
+            self._unregister_resource(resource)
+            if self._shared:
+                self._shared.discard(resource.name)
+            self._period_masks.pop(resource,None)
         else:
             raise Exception('ERROR: resource with name %s not contained in scenario %s'%
                         (str(resource.name),str(self.name)))
-        self._constraints = [C for C in self._constraints if resource not in C.resources()]
+        self._filter_constraints(lambda C: resource not in C.resources())
 
     def get_periods(self,el):
         """
         return the valid periods of this task or resource. If no specific periods
-        are defined, take all periods of the scenario
+        are defined, take all periods of the scenario as range. The result must not
+        be changed
         """
         if el.periods is None:
-            return list(range(self.horizon))
+            return range(self.horizon)
         return el.periods
 
+    def get_period_mask(self,el):
+        """
+        return the valid periods of this task or resource as bitset, that is, bit t
+        is set if period t is valid. Masks are cached, intersect them with &
+        """
+        periods = el.periods
+        size = None if periods is None else len(periods)
+        mask = self._period_masks.get(el)
+        # the cache is valid as long as the periods are not replaced or extended
+        if mask is not None and mask[0] is periods and mask[1] == size and mask[2] == self.horizon:
+            return mask[3]
+        if periods is None:
+            bits = (1 << self.horizon)-1
+        else:
+            bits = 0
+            for t in periods:
+                if t >= 0:
+                    bits |= 1 << t
+        self._period_masks[el] = (periods,size,self.horizon,bits)
+        return bits
+
+    @staticmethod
+    def get_mask_periods(mask):
+        """
+        return the sorted list of periods in the given bitset
+        """
+        return [ t for t,bit in enumerate(reversed(bin(mask)[2:])) if bit == '1' ]
+
+    def get_start_mask(self,task):
+        """
+        return the periods where the task can start as bitset, these are the
+        periods of the task and of all resources it requires for sure
+        """
+        mask = self.get_period_mask(task)
+        for RA in task.resources_req:
+            if len(RA) == 1:
+                for R in RA:
+                    mask &= self.get_period_mask(R)
+        return mask
+
+    def get_time_windows(self,periods=True):
+        """
+        return the earliest and latest start of all tasks as mapping task -> (earliest,latest)
+        by propagating bounds and precedences. If periods is True, starts are also
+        restricted to the start masks of the tasks. The latest start is None if there is no
+        horizon, and an earliest start larger than the latest start means that the scenario
+        is infeasible. Only precedences without resources and with non-negative offset
+        between tasks that have to be scheduled are used
+        """
+        masks = dict()
+        windows = OrderedDict()
+        for T in self.tasks():
+            if periods and self.horizon is not None:
+                masks[T] = self.get_start_mask(T)
+            windows[T] = [0,None if self.horizon is None else self.horizon-1]
+
+        def update(T,earliest,latest):
+            mask = masks.get(T)
+            if mask is not None:
+                mask &= ~((1 << earliest)-1)
+                if latest is not None:
+                    mask &= (1 << max(latest+1,0))-1
+                if not mask:
+                    windows[T] = [earliest,earliest-1]
+                    return
+                earliest, latest = (mask & -mask).bit_length()-1, mask.bit_length()-1
+            windows[T] = [earliest,latest]
+
+        def min_latest(a,b):
+            if a is None:
+                return b
+            if b is None:
+                return a
+            return min(a,b)
+
+        def empty(T):
+            earliest, latest = windows[T]
+            return latest is not None and earliest > latest
+
+        for T in windows:
+            update(T,*windows[T])
+        for P in self.bounds_low():
+            update(P.task,max(windows[P.task][0],P.bound),windows[P.task][1])
+        for P in self.bounds_up():
+            update(P.task,windows[P.task][0],min_latest(windows[P.task][1],P.bound-P.task.length))
+        for P in self.bounds_low_tight():
+            update(P.task,max(windows[P.task][0],P.bound),min_latest(windows[P.task][1],P.bound))
+        for P in self.bounds_up_tight():
+            bound = P.bound-P.task.length
+            update(P.task,max(windows[P.task][0],bound),min_latest(windows[P.task][1],bound))
+
+        # arcs (T,T_,d) require that T_ starts at least d periods after T
+        arcs = list()
+        for P in itertools.chain(self.precs_lax(),self.precs_tight()):
+            if P.resource_left is not None or P.resource_right is not None or P.offset < 0 \
+               or P.task_left.schedule_cost is not None or P.task_right.schedule_cost is not None:
+                continue
+            arcs.append((P.task_left,P.task_right,P.task_left.length+P.offset))
+            if isinstance(P,PrecedenceTight):
+                arcs.append((P.task_right,P.task_left,-P.task_left.length-P.offset))
+
+        # earliest starts are pushed forward in topological order and latest starts
+        # backward in reverse order, so one round suffices for lax precedences. Further
+        # rounds are only required for the reverse arcs of tight precedences and cycles
+        order, rest = self._get_precedence_graph().order()
+        rank = { name : i for i,name in enumerate(itertools.chain(order,rest)) }
+        forward = sorted(arcs,key=lambda arc: rank[arc[0].name])
+        backward = sorted(arcs,key=lambda arc: -rank[arc[1].name])
+        # without masks, changes after more rounds than tasks come from a cycle of positive
+        # length, which is infeasible. With masks, windows only shrink within the horizon
+        for round_ in itertools.count():
+            changed = None
+            for T,T_,d in forward:
+                earliest_, latest_ = windows[T_]
+                if windows[T][0]+d > earliest_:
+                    update(T_,windows[T][0]+d,latest_)
+                    changed = T_
+                    if empty(T_):
+                        return OrderedDict( (T,tuple(windows[T])) for T in windows )
+            for T,T_,d in backward:
+                earliest, latest = windows[T]
+                latest_ = windows[T_][1]
+                if latest_ is not None and (latest is None or latest_-d < latest):
+                    update(T,earliest,latest_-d)
+                    changed = T
+                    if empty(T):
+                        return OrderedDict( (T,tuple(windows[T])) for T in windows )
+            if changed is None:
+                break
+            if round_ >= len(windows) and not masks:
+                windows[changed] = [windows[changed][0],windows[changed][0]-1]
+                break
+        return OrderedDict( (T,tuple(windows[T])) for T in windows )
+
+    def _get_precedence_graph(self):
+        """
+        return the graph of the lax and tight precedences, it is kept up to date
+        when constraints are added or removed
+        """
+        if self._precedence_graph is None:
+            graph = _PrecedenceGraph(self._tasks)
+            for P in itertools.chain(self.precs_lax(),self.precs_tight()):
+                graph.add(P._key(),P.task_left.name,P.task_right.name)
+            self._precedence_graph = graph
+        return self._precedence_graph
+
+    def _get_precedence_arcs(self,name):
+        """
+        return the arcs (name_,d) from the task with the given name to all tasks with
+        name_ which have to start at least d periods later due to precedences without
+        resources
+        """
+        arcs = list()
+        for name_,keys in self._get_precedence_graph().succ[name].items():
+            d = None
+            for key in keys:
+                P = self._constraints[key]
+                if P.resource_left is None and P.resource_right is None:
+                    d = max(d,P.task_left.length+P.offset) if d is not None else P.task_left.length+P.offset
+            if d is not None:
+                arcs.append((name_,d))
+        return arcs
+
+    def precedence_order(self):
+        """
+        return the tasks sorted according to the lax and tight precedences
+        """
+        order, rest = self._get_precedence_graph().order()
+        if rest:
+            raise Exception('ERROR: precedences of scenario %s contain a cycle'%str(self.name))
+        tasks = { T.name : T for T in self.tasks() }
+        return [ tasks[name] for name in order ]
+
+    def precedence_cycle(self):
+        """
+        return the tasks of a cycle of precedences without resources of positive length,
+        or None if there is no such cycle. Such cycles make the scenario infeasible
+        """
+        order, rest = self._get_precedence_graph().order()
+        if not rest:
+            return None
+        # longest paths in the remaining graph, they only grow beyond
+        # len(rest) rounds along a positive cycle
+        start = { name : 0 for name in rest }
+        arcs = { name : self._get_precedence_arcs(name) for name in rest }
+        pred = dict()
+        changed = None
+        for _ in range(len(rest)+1):
+            changed = None
+            for name in rest:
+                for name_,d in arcs[name]:
+                    if name_ in start and start[name]+d > start[name_]:
+                        start[name_] = start[name]+d
+                        pred[name_] = name
+                        changed = name_
+            if changed is None:
+                return None
+        # go back enough steps to end up on the cycle
+        for _ in range(len(rest)):
+            changed = pred[changed]
+        cycle = [changed]
+        while pred[cycle[-1]] != changed:
+            cycle.append(pred[cycle[-1]])
+        cycle.reverse()
+        # start with the task added first
+        position = { name : i for i,name in enumerate(rest) }
+        first = min(range(len(cycle)),key=lambda i: position[cycle[i]])
+        tasks = { T.name : T for T in self.tasks() }
+        return [ tasks[name] for name in cycle[first:]+cycle[:first] ]
+
+    def critical_path(self):
+        """
+        return the length of a longest chain of precedences without resources, from the
+        start of its first task to the end of its last task, and the tasks of this chain
+        """
+        order, rest = self._get_precedence_graph().order()
+        if rest:
+            raise Exception('ERROR: precedences of scenario %s contain a cycle'%str(self.name))
+        tasks = { T.name : T for T in self.tasks() }
+        if not tasks:
+            return 0, []
+        start = { name : 0 for name in order }
+        pred = dict()
+        for name in order:
+            for name_,d in self._get_precedence_arcs(name):
+                if start[name]+d > start[name_]:
+                    start[name_] = start[name]+d
+                    pred[name_] = name
+        name = max(order,key=lambda name: start[name]+tasks[name].length)
+        length = start[name]+tasks[name].length
+        path = [name]
+        while path[-1] in pred:
+            path.append(pred[path[-1]])
+        return length, [ tasks[name] for name in reversed(path) ]
+
+    def transitive_reduction(self):
+        """
+        return the pairs of tasks (T,T_) with lax or tight precedences from T to T_ which
+        are not implied by other precedences
+        """
+        graph = self._get_precedence_graph()
+        order, rest = graph.order()
+        if rest:
+            raise Exception('ERROR: precedences of scenario %s contain a cycle'%str(self.name))
+        tasks = { T.name : T for T in self.tasks() }
+        rank = { name : i for i,name in enumerate(order) }
+        # descendants as bitsets over the ranks
+        reach = dict()
+        pairs = list()
+        for name in reversed(order):
+            covered = 0
+            for name_ in sorted(graph.succ[name],key=rank.get):
+                if not covered >> rank[name_] & 1:
+                    pairs.append((name,name_))
+                covered |= reach[name_] | 1 << rank[name_]
+            reach[name] = covered
+        pairs.sort(key=lambda pair: (rank[pair[0]],rank[pair[1]]))
+        return [ (tasks[name],tasks[name_]) for name,name_ in pairs ]
+
     def __iadd__(self,other):
         if _isiterable(other):
             for x in other:
@@ -572,10 +1651,12 @@ class Scenario(_SchedElement):
         return self
 
     def __contains__(self, item):
-        if isinstance(item,Task):
-            return item in self._tasks.values()
-        elif isinstance(item,Resource):
-            return item in self._resources.values()
+        if isinstance(item,(Task,Resource)):
+            el = (self._tasks if isinstance(item,Task) else self._resources).get(item.name)
+            # a fork also contains the elements of the scenario it was forked from
+            return el is item or (self._forked and el is not None and el == item)
+        elif isinstance(item,_Constraint):
+            return item._key() in self._constraints
         else:
             raise Exception('ERROR: %s cannot be checked for containment in scenario %s'%(str(item),str(self.name)))
         return self
@@ -584,6 +1665,8 @@ class Scenario(_SchedElement):
         if item not in self._tasks and item not in self._resources:
             raise Exception('ERROR: task or resource with name %s is not contained in scenario %s'%
                         (str(item),str(self.name)))
+        if item in self._shared:
+            return self._view(item)
         if item in self._tasks:
             return self._tasks[item]
         return self._resources[item]
@@ -599,59 +1682,109 @@ class Scenario(_SchedElement):
         for T in self.tasks():
             if not T.resources_req:
                 raise Exception('ERROR: task %s has no resource requirement'%str(T))
+        # check if precedences are cyclic
+        cycle = self.precedence_cycle()
+        if cycle is not None:
+            raise Exception('ERROR: precedences of tasks %s form a cycle'%','.join(str(T) for T in cycle))
 
-    def __str__(self):
-        s = '###############################################\n'
-        s += '\n'
-        s += 'SCENARIO: '+self.name
+    def tighten_horizon(self,msg=0,apply=False):
+        """
+        Returns the makespan of a greedy schedule as a tighter horizon, and sets
+        the horizon to it if apply is True, see pyschedule.solvers.listsched.tighten_horizon
+        """
+        from .solvers import listsched
+        return listsched.tighten_horizon(self,msg=msg,apply=apply)
+
+    def save(self,path):
+        """
+        Writes the scenario including its constraints and solution to path
+        in the columnar format of pyschedule.storage
+        """
+        from . import storage
+        storage.save(self,path)
+
+    @staticmethod
+    def load(path):
+        """
+        Reads a scenario written by save. To access the columns of a large
+        scenario without creating all tasks, use pyschedule.storage.ScenarioFile
+        """
+        from . import storage
+        return storage.load(path)
+
+    def summary(self):
+        """
+        Returns a short description of the scenario, e.g. to name solver models. In
+        contrast to str, this does not render all tasks and constraints
+        """
+        return '%s: %i tasks, %i resources, %i constraints, horizon %s'%\
+               (str(self.name),len(self._tasks),len(self._resources),len(self._constraints),str(self.horizon))
+
+    def dump(self,file=None):
+        """
+        Writes the report returned by str to file, default is sys.stdout. Lines are
+        written one by one, so the whole report is never kept in memory
+        """
+        if file is None:
+            file = sys.stdout
+        write = file.write
+        write('###############################################\n')
+        write('\n')
+        write('SCENARIO: '+self.name)
         if self.horizon is not None:
-            s += ' / horizon: %i\n\n'%self.horizon
+            write(' / horizon: %i\n\n'%self.horizon)
         else:
-            s += ' / no horizon set\n\n'
+            write(' / no horizon set\n\n')
 
-        s += 'OBJECTIVE: '+str(self.objective())+'\n\n'
+        write('OBJECTIVE: '+str(self.objective())+'\n\n')
 
-        s += 'RESOURCES:\n'
+        write('RESOURCES:\n')
         for R in self.resources():
-            s += str(R.name)+'\n'
-        s += '\n'
+            write(str(R.name)+'\n')
+        write('\n')
 
-        s += 'TASKS:\n'
+        write('TASKS:\n')
         for T in self.tasks():
-            s += '%s: %s\n'%(str(T.name),','.join([str(RA) for RA in T.resources_req]))
-        s += '\n'
+            write('%s: %s\n'%(str(T.name),','.join([str(RA) for RA in T.resources_req])))
+        write('\n')
 
-        s += 'JOINT RESOURCES:\n'
+        write('JOINT RESOURCES:\n')
         ra_to_tasks = self.resources_req_tasks()
         for RA in ra_to_tasks:
             if len(RA) < 2:
                 continue
-            s += '%s: %s\n'%(str(RA),','.join([str(T) for T in ra_to_tasks[RA]]))
-        s += '\n'
+            write('%s: %s\n'%(str(RA),','.join([str(T) for T in ra_to_tasks[RA]])))
+        write('\n')
 
-        def print_constraint(title,constraints):
-            s = ''
+        def write_constraints(title,constraints):
             if constraints:
-                s += '%s:\n'%title
-                s += '\n'.join([C.__repr__() for C in constraints]) + '\n'
-                s += '\n'
-            return s
-        s += print_constraint('LAX PRECEDENCES',self.precs_lax())
-        s += print_constraint('TIGHT PRECEDENCES',self.precs_tight())
-        s += print_constraint('COND PRECEDENCES',self.precs_cond())
-        s += print_constraint('LOWER BOUNDS',self.bounds_low())
-        s += print_constraint('UPPER BOUNDS',self.bounds_up())
-        s += print_constraint('TIGHT LOWER BOUNDS',self.bounds_low_tight())
-        s += print_constraint('TIGHT UPPER BOUNDS',self.bounds_up_tight())
-        s += print_constraint('CAPACITY BOUNDS',self.capacity())
-        s += '###############################################'
-        return s
+                write('%s:\n'%title)
+                for C in constraints:
+                    write(C.__repr__()+'\n')
+                write('\n')
+        write_constraints('LAX PRECEDENCES',self.precs_lax())
+        write_constraints('TIGHT PRECEDENCES',self.precs_tight())
+        write_constraints('COND PRECEDENCES',self.precs_cond())
+        write_constraints('LOWER BOUNDS',self.bounds_low())
+        write_constraints('UPPER BOUNDS',self.bounds_up())
+        write_constraints('TIGHT LOWER BOUNDS',self.bounds_low_tight())
+        write_constraints('TIGHT UPPER BOUNDS',self.bounds_up_tight())
+        write_constraints('CAPACITY BOUNDS',self.capacity())
+        write('###############################################')
 
+    def __str__(self):
+        s = io.StringIO()
+        self.dump(s)
+        return s.getvalue()
 
-class Task(_SchedElement):
+
+class Task(_SlottedSchedElement):
     """
     A task to be processed by at least one resource
     """
+    __slots__ = ('length','group','periods','start_value','resources','_resources_req','tasks_req',
+                 'schedule_cost','delay_cost','_resources_in_req')
+
     def __init__(self,name,length=1,group=None,periods=None,schedule_cost=None,delay_cost=None,**kwargs):
         super().__init__(name)
         if not isinstance(length, int):
@@ -662,9 +1795,10 @@ class Task(_SchedElement):
         self.periods = periods # periods when task can be scheduled
 
         # additional parameters
+        self._resources_in_req = dict() # resources in requirements, mapped to their number of occurrences
         self.start_value = None # should be filled by solver
         self.resources = None # should be filled by solver
-        self.resources_req = [] # required resources
+        self._resources_req = [] # required resources
         self.tasks_req = [] # resource usage is inherited from these tasks
         self.schedule_cost = schedule_cost # in case not None, then the task is optional adds the schedule_cost to the objective if the task is scheduled
         self.delay_cost = delay_cost # cost on the final completion time
@@ -712,7 +1846,10 @@ class Task(_SchedElement):
 
     def add_resources_req(self, resource):
         if resource not in self.resources_req:
+            if _sharing[0]:
+                self._before_write()
             self.resources_req.append(resource)
+            self._link_resources_req(resource)
         else:
             raise ValueError("Resource requirements already set")
         return self
@@ -722,11 +1859,35 @@ class Task(_SchedElement):
         return self
 
     def get_resources_in_req(self):
-        return { R for RA in self.resources_req for R in RA }
+        return set(self._resources_in_req)
+
+    def _link_resources_req(self, RA):
+        for R in RA:
+            if R in self._resources_in_req:
+                self._resources_in_req[R] += 1
+                continue
+            self._resources_in_req[R] = 1
+            for ref in self._scenarios:
+                S = ref()
+                if S is not None:
+                    S._link_task_resource(self,R)
+
+    def _unlink_resources_req(self, RA):
+        for R in RA:
+            self._resources_in_req[R] -= 1
+            if self._resources_in_req[R]:
+                continue
+            del self._resources_in_req[R]
+            for ref in self._scenarios:
+                S = ref()
+                if S is not None:
+                    S._unlink_task_resource(self,R)
 
     def add_tasks_req(self,T):
         if T in self.tasks_req:
             return self
+        if _sharing[0]:
+            self._before_write()
         self.tasks_req.append(T)
         return self
 
@@ -783,11 +1944,28 @@ class Task(_SchedElement):
             return False
         return True
 
-    def __setattr__(self, attr, value):
-        if attr == 'completion_time_cost':
-            warnings.warn('WARNING: attribute completion_time_cost is deprecated, use attribute delay_cost instead')
-            attr = 'delay_cost'
-        self.__dict__[attr] = value
+    @property
+    def resources_req(self):
+        return self._resources_req
+
+    @resources_req.setter
+    def resources_req(self, value):
+        # keep the resource index in sync with the requirements
+        for RA in self._resources_req:
+            self._unlink_resources_req(RA)
+        for RA in value:
+            self._link_resources_req(RA)
+        self._resources_req = value
+
+    @property
+    def completion_time_cost(self):
+        warnings.warn('WARNING: attribute completion_time_cost is deprecated, use attribute delay_cost instead')
+        return self.delay_cost
+
+    @completion_time_cost.setter
+    def completion_time_cost(self, value):
+        warnings.warn('WARNING: attribute completion_time_cost is deprecated, use attribute delay_cost instead')
+        self.delay_cost = value
 
 
 class TaskList(_List):
@@ -819,6 +1997,8 @@ class ResourceList(_List):
 
 
 class _TaskAffine(_SchedElementAffine):
+    __slots__ = ()
+
     def __init__(self,unknown=None):
         super().__init__(unknown=unknown)
 
@@ -917,7 +2097,6 @@ class _Constraint(_SchedElement):
     """ An abstract class """
     def __init__(self):
         super().__init__()
-        self._uid = uuid.uuid4().int
 
     def tasks(self):
         return list()
@@ -925,6 +2104,12 @@ class _Constraint(_SchedElement):
     def resources(self):
         return list()
 
+    def _key(self):
+        """
+        Structural key, constraints with equal keys are considered duplicates
+        """
+        return (type(self),self._uid)
+
     def __hash__(self):
         return self._uid
 
@@ -938,6 +2123,9 @@ class _Bound(_Constraint):
     def tasks(self):
         return [self.task]
 
+    def _key(self):
+        return (type(self),self.task.name,self.bound)
+
     def __repr__(self):
         return str(self.task) + ' ' + str(self.comp_operator) + ' ' + str(self.bound)
 
@@ -996,6 +2184,10 @@ class _Precedence(_Constraint):
     def tasks(self):
         return [self.task_left, self.task_right]
 
+    def _key(self):
+        return (type(self),self.task_left.name,_key(self.resource_left),
+                self.task_right.name,_key(self.resource_right),self.offset)
+
     def __repr__(self):
         s = str(self.task_left)
         if self.resource_left is not None:
@@ -1041,10 +2233,12 @@ class PrecedenceCond(_Precedence):
         self.comp_operator = '<<'
 
 
-class Resource(_SchedElement):
+class Resource(_SlottedSchedElement):
     """
     A resource which can processes tasks
     """
+    __slots__ = ('size','group','periods','cost_per_period','_coeff')
+
     def __init__(self,name=None,size=1,group=None,periods=None,cost_per_period=None,**kwargs):
         super().__init__(name)
         self.size = size
@@ -1075,6 +2269,8 @@ class Resource(_SchedElement):
 
 
 class _ResourceAffine(_SchedElementAffine):
+    __slots__ = ()
+
     def __init__(self,unknown=None):
         super().__init__(unknown=unknown,affine_operator='|')
 
@@ -1152,6 +2348,9 @@ class _Slice(_SchedElement):
         else:
             return AssertionError("Unhandled key type")
 
+    def _key(self):
+        return (self.resource.name,self._param,self._start,self._end,self.kind,self.name)
+
     def weight(self,T,t=None):
         """
         t: start position of T. In this case we take weight proportional with overlap
@@ -1169,8 +2368,9 @@ class _Slice(_SchedElement):
             end = t+T.length
         else:
             end = self._end
-        overlap = len(set(range(start,end)) & set(range(t,t+T.length)))
-        if not overlap:
+        # overlap of the periods start..end-1 and t..t+T.length-1
+        overlap = min(end,t+T.length)-max(start,t)
+        if overlap <= 0:
             return 0
         w *= float(overlap)/float(T.length)
         return w
@@ -1245,6 +2445,8 @@ class _SliceAffine(_SchedElementAffine):
     """
     linear combination of resource slices to be turned into a capacity contraint
     """
+    __slots__ = ()
+
     def __init__(self,unknown=None):
         super().__init__(unknown=unknown,affine_operator='+')
 
@@ -1307,6 +2509,9 @@ class Capacity(_Constraint):
     def slices_max(self):
         return self.slices(kind='max')
 
+    def _key(self):
+        return (type(self),self.SLA._key(),self.bound)
+
     def __str__(self):
         return str(self.SLA) + ' <= ' + str(self.bound)
 
@@ -32,3 +32,7 @@ from . import mip
 from . import mip_bigm
 from . import ortools_cp_sat
 from . import listsched
+from . import timescale
+from . import symmetry
+from . import decompose
+from . import mip_array
@@ -0,0 +1,146 @@
+#Copyright 2015 Tim Nonner
+#
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import collections
+import concurrent.futures
+
+from ..pyschedule import Scenario, Task, Resource, _Precedence, Capacity
+
+def _elements(C) :
+    """
+    returns the tasks and resources which constraint C refers to
+    """
+    elements = list(C.tasks())+list(C.resources())
+    if isinstance(C,_Precedence) :
+        elements += [C.resource_left,C.resource_right]
+    elif isinstance(C,Capacity) :
+        elements += [ SL.resource for SL in C.slices() ]
+    return [ el for el in elements if el is not None ]
+
+def components(scenario) :
+    """
+    returns the connected components of the graph whose nodes are the tasks and
+    resources of the scenario, and tasks are connected to the resources they require,
+    to the tasks and resources in their task requirements, to the tasks of the same
+    group and to all elements of a common constraint. Each component is a list of
+    tasks, resources and constraints in the order of the scenario, resources without
+    tasks and constraints are left out
+    """
+    S = scenario
+    parent = dict()
+
+    def find(el) :
+        root = el
+        while parent.setdefault(root,root) is not root :
+            root = parent[root]
+        # path compression
+        while parent[el] is not root :
+            parent[el], el = root, parent[el]
+        return root
+
+    def union(elements) :
+        roots = [ find(el) for el in elements ]
+        for root in roots[1:] :
+            parent[root] = roots[0]
+
+    groups = dict()
+    for T in S.tasks() :
+        find(T)
+        for RA in T.resources_req :
+            union([T]+list(RA))
+        for TR in T.tasks_req :
+            if TR in S.tasks() :
+                union([T,TR])
+                continue
+            union([T]+[ T_ for T_ in TR ]+
+                  [ R for R in TR.map_obj.values() if isinstance(R,Resource) ])
+        if T.group is not None :
+            union([T,groups.setdefault(T.group,T)])
+    constraints = S.constraints()
+    for C in constraints :
+        union(_elements(C))
+
+    elements = collections.OrderedDict()
+    for T in S.tasks() :
+        elements.setdefault(find(T),list()).append(T)
+    for R in S.resources() :
+        if R in parent :
+            # resources without tasks but with constraints form their own components
+            elements.setdefault(find(R),list()).append(R)
+    for C in constraints :
+        elements[find(_elements(C)[0])].append(C)
+    return list(elements.values())
+
+def _solve(scenario,solve_method) :
+    result = solve_method(scenario)
+    solution = { T.name : (T.start_value,[ R.name for R in T.resources ]
+                           if T.resources is not None else None)
+                 for T in scenario.tasks() }
+    return result, solution
+
+def solve(scenario,solve_method,processes=None,msg=0) :
+    """
+    Splits the scenario into its components, see components, solves each component
+    with solve_method in a pool of processes and writes the solutions back to the
+    given scenario. The objective of a scenario is the sum of the objectives of its
+    components, so the combined solution is optimal if all components are solved
+    to optimality
+
+    Arguments:
+        scenario     : the scenario to solve
+        solve_method : the solve method to use, e.g. solvers.mip.solve, use
+                       functools.partial to pass parameters. Must be picklable
+                       if several processes are used
+        processes    : the number of processes, default is the number of cpus,
+                       1 solves the components in this process
+    """
+    S = scenario
+    parts = components(S)
+    # components without tasks only hold constraints of resources without tasks,
+    # these are solved with the first component to keep infeasible ones
+    free = [ el for elements in parts if not isinstance(elements[0],Task) for el in elements ]
+    if free :
+        parts = [ elements for elements in parts if isinstance(elements[0],Task) ] or [[]]
+        parts[0] = parts[0]+free
+    scenarios = list()
+    for i,elements in enumerate(parts) :
+        S_ = Scenario(name='%s_%i'%(S.name,i),horizon=S.horizon,start_time=S.start_time,
+                      end_time=S.end_time,steptime=S.steptime,duration=S.duration)
+        for el in elements :
+            if isinstance(el,Resource) :
+                S_.add_resource(el)
+            else :
+                S_ += el
+        scenarios.append(S_)
+    if msg :
+        print('INFO: scenario %s has %i components, the largest has %i tasks'%
+              (S.name,len(scenarios),max([ len(S_.tasks()) for S_ in scenarios ]+[0])))
+
+    if processes == 1 or len(scenarios) <= 1 :
+        results = [ _solve(S_,solve_method) for S_ in scenarios ]
+    else :
+        with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor :
+            results = list(executor.map(_solve,scenarios,[solve_method]*len(scenarios)))
+
+    resources = { R.name : R for R in S.resources() }
+    for S_,(result,solution) in zip(scenarios,results) :
+        for T in S_.tasks() :
+            T.start_value, names = solution[T.name]
+            T.resources = [ resources[name] for name in names ] if names is not None else None
+    return int(all( result for result,_ in results ))
@@ -17,24 +17,131 @@
 #specific language governing permissions and limitations
 #under the License.
 
-try:
-    import networkx as nx
-    HAVE_NETWORKX = True
-except ModuleNotFoundError:
-    HAVE_NETWORKX = False
+import collections
 
 def sort_with_precs(scenario) :
     """
     returns the tasks of the given scenario sorted according to the
-    lax precedence constraints and next according to the task length,
-    where large tasks have priority
+    lax and tight precedence constraints
+    """
+    return scenario.precedence_order()
+
+
+def serial_schedule(scenario) :
+    """
+    schedules the tasks one by one in the order of the precedences, each at its
+    earliest feasible start. Returns a mapping of tasks to their start and resources,
+    or None if no start was found or the scenario contains constraints which are
+    not supported: capacities, conditional precedences, upper bounds, task requirements,
+    task groups and precedences with resources
+    """
+    S = scenario
+    precs = S.precs_lax() + S.precs_tight()
+    if S.capacity() or S.precs_cond() or S.bounds_up() or S.bounds_up_tight() \
+       or any( P.resource_left is not None or P.resource_right is not None for P in precs ) \
+       or any( T.tasks_req or T.group is not None for T in S.tasks() ):
+        return None
+    if S.precedence_cycle() is not None:
+        return None
+    try:
+        task_list = S.precedence_order()
+    except Exception:
+        return None
+
+    windows = S.get_time_windows()
+    preds = { T : [] for T in task_list }
+    for P in S.precs_lax():
+        preds[P.task_right].append((P.task_left,P.task_left.length+P.offset,False))
+    for P in S.precs_tight():
+        preds[P.task_right].append((P.task_left,P.task_left.length+P.offset,True))
+    load = collections.defaultdict(lambda: collections.defaultdict(float))
+    choices = dict() # alternatives shared by tasks use the same resource
+
+    def fit(T,t) :
+        resources = collections.OrderedDict()
+        for RA in T.resources_req :
+            alternatives = [choices[RA]] if RA in choices else list(RA)
+            for R in alternatives :
+                size = R.size if R.size is not None else 1
+                if S.get_period_mask(R) >> t & 1 and \
+                   all( load[R][t_]+resources.get(R,0)+RA[R] <= size
+                        for t_ in range(t,t+max(T.length,1)) ):
+                    resources[R] = resources.get(R,0)+RA[R]
+                    break
+            else:
+                return None
+        return resources
+
+    schedule = collections.OrderedDict()
+    for T in task_list :
+        earliest, latest = windows[T]
+        fixed = None
+        for T_,d,tight in preds[T] :
+            earliest = max(earliest,schedule[T_][0]+d)
+            if tight :
+                if fixed is not None and fixed != schedule[T_][0]+d :
+                    return None
+                fixed = schedule[T_][0]+d
+        mask = S.get_start_mask(T)
+        starts = range(earliest,min(latest,S.horizon-1)+1)
+        if fixed is not None :
+            starts = [fixed] if fixed in starts else []
+        for t in starts :
+            if not mask >> t & 1 :
+                continue
+            resources = fit(T,t)
+            if resources is not None :
+                break
+        else :
+            return None
+        for RA in T.resources_req :
+            choices.update( (RA,R) for R in resources if R in RA )
+        for R in resources :
+            for t_ in range(t,t+max(T.length,1)) :
+                load[R][t_] += resources[R]
+        schedule[T] = (t,list(resources))
+    return schedule
+
+
+def tighten_horizon(scenario,msg=0,apply=False) :
+    """
+    returns the makespan of a serial schedule, see serial_schedule, as a tighter
+    horizon of the given scenario. The scenario stays feasible with this horizon,
+    and the makespan objective keeps its optimum. The horizon of the scenario is
+    only changed if apply is True
     """
     S = scenario
-    G = nx.DiGraph()
-    G.add_nodes_from(S.tasks())
-    G.add_edges_from([ (P.task_left,P.task_right) for P in S.precs_lax() ])
-    task_list = nx.algorithms.topological_sort(G)
-    return task_list
+    if S.horizon is None :
+        raise Exception('ERROR: tightening requires scenarios with defined horizon')
+    schedule = serial_schedule(S)
+    if schedule is None :
+        if msg :
+            print('INFO: no serial schedule found, horizon %i is not tightened'%S.horizon)
+        return S.horizon
+
+    def count_starts() :
+        # the number of start periods of all tasks, i.e. the variables of a time-indexed model
+        count = 0
+        for T,(earliest,latest) in S.get_time_windows().items() :
+            if earliest <= latest :
+                count += bin(S.get_start_mask(T) >> earliest << earliest & (1 << latest+1)-1).count('1')
+        return count
+
+    horizon = max( t+max(T.length,1) for T,(t,resources) in schedule.items() )
+    if horizon >= S.horizon :
+        return S.horizon
+    if msg :
+        starts = count_starts()
+        length, path = S.critical_path()
+        print('INFO: horizon tightened from %i to %i, critical path has length %i'%(S.horizon,horizon,length))
+        old_horizon, S.horizon = S.horizon, horizon
+        try :
+            print('INFO: start periods reduced from %i to %i'%(starts,count_starts()))
+        finally :
+            S.horizon = old_horizon
+    if apply :
+        S.horizon = horizon
+    return horizon
 
 
 #TODO: list as parameter of solving procedure
@@ -49,15 +156,13 @@ def solve(scenario,solve_method,task_list=None,batch_size=1,plot_method=None,msg
                      added to the schedule
         batch_size : the number of tasks to integrate in the schedule at a time
     """
-    if not HAVE_NETWORKX:
-        raise ModuleNotFoundError("networkx not installed")
     S = scenario
 
     if task_list is None :
         task_list = sort_with_precs(S)
 
-    constraints = S._constraints # keep references and clear old reference list
-    S._constraints = []
+    constraints = S.constraints() # keep references and clear old constraints
+    S.clear_constraints()
 
     #non_objective_tasks = [ T for T in task_list if not T.objective ]
     for T in task_list :
@@ -72,7 +177,11 @@ def solve(scenario,solve_method,task_list=None,batch_size=1,plot_method=None,msg
             print('INFO: batch for list scheduling '+','.join([ str(T) for T in batch]))
         for T in batch :
             S += T
-        S._constraints = [ C for C in constraints if set(C.tasks()).issubset(set(S.tasks())) ]
+        S.clear_constraints()
+        tasks = set(S.tasks())
+        for C in constraints:
+            if set(C.tasks()).issubset(tasks):
+                S += C
 
         solve_method(S)
         if plot_method is not None:
@@ -18,9 +18,11 @@
 #under the License.
 
 import collections
-import copy
+import heapq
 
 from .mip_pulp import MIP
+from . import mip_array
+from . import symmetry
 
 def _get_groups(scenario,elements):
     """
@@ -41,34 +43,88 @@ def _get_groups(scenario,elements):
     groups.update([ (T,[T]) for T in elements if T not in el_in_groups ])
     return groups
 
-def _get_task_groups(scenario):
+def _get_task_groups(scenario,symmetries=False):
     elements = scenario.tasks()
-    return _get_groups(scenario,elements)
+    groups = _get_groups(scenario,elements)
+    if symmetries:
+        # interchangeable tasks are grouped like tasks with the same group
+        for tasks in symmetry.task_classes(scenario,aggregate=True):
+            for T in tasks[1:]:
+                del groups[T]
+            groups[tasks[0]] = tasks
+    return groups
 
 def _get_resource_groups(scenario):
-    elements = scenario.resources()
-    return _get_groups(scenario,elements)
+    """
+    computes the resources of the same group which can be aggregated into a single
+    resource whose size is the number of resources in the group. This requires
+    interchangeable resources of size one, see solvers.symmetry, which each task
+    requires at most once and with coefficient one. Tasks in conditional precedences
+    and task requirements must not use them, since these refer to single resources
+    returns a mapping a group representative to the group
+    """
+    S = scenario
+    cond_tasks = { T for P in S.precs_cond() for T in (P.task_left,P.task_right) }
+    req_resources = { R for T in S.tasks() for TR in T.tasks_req
+                      for R in getattr(TR,'map_obj',dict()).values() }
+    groups = collections.OrderedDict()
+    for resources in symmetry.resource_classes(scenario,groups=True):
+        R = resources[0]
+        if R.size not in (None,1) or R in req_resources:
+            continue
+        tasks = S.tasks(resource=R)
+        if set(tasks) & cond_tasks:
+            continue
+        if any( RA[R] != 1 or len([ RA_ for RA_ in T.resources_req if R in RA_ ]) > 1
+                for T in tasks for RA in T.resources_req if R in RA ):
+            continue
+        groups[R] = resources
+    return groups
 
 
-def solve(scenario, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0):
+def solve(scenario, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0, tighten_horizon=False,
+          symmetries=False, cumulative_precs=None, cumulative_precs_cond=False, array_model=False,
+          threads=None, callback=None, warm_start=False):
     """
     Solves the given scenario using a discrete MIP
 
     Args:
         scenario:            scenario to solve
-        kind:                MIP-solver to use: CPLEX, GLPK, CBC, SCIP, GUROBI
-        time_limit:          a time limit, only for CPLEX, CBC and SCIP
+        kind:                MIP-solver to use: CPLEX, GLPK, CBC, SCIP, GUROBI, HIGHS
+        time_limit:          a time limit, only for CPLEX, CBC, SCIP and HIGHS
         random_seed:         random seed
         ratio_gap:           MIP-gap
         msg:                 0 means no feedback (default) during computation, 1 means feedback
+        tighten_horizon:     build the MIP on the makespan of a greedy schedule instead of the
+                             horizon, this keeps the optimal makespan but might exclude optimal
+                             schedules for other objectives
+        symmetries:          group interchangeable tasks, see solvers.symmetry
+        cumulative_precs:    formulate lax precedences with variables which count the starts of
+                             each task, this needs much less nonzeros. The default is to use them
+                             if there are more than 100 lax precedences
+        cumulative_precs_cond: the same for conditional precedences
+        array_model:         keep the model in arrays instead of pulp objects, see solvers.mip_array,
+                             only for CBC, HIGHS always uses it
+        threads:             number of threads, only for HIGHS
+        callback:            function which is called with the objective value of each new
+                             solution and stops the solver if it returns True, only for HIGHS
+        warm_start:          use the current solution of the scenario as mip start, only for
+                             CBC and HIGHS
 
     Returns:
         1 if solving was successful
         0 if solving was not successful
     """
     scenario.check()
-    mip = MIP(str(scenario))
-    return DiscreteMIP(mip).solve(scenario, kind=kind, time_limit=time_limit, random_seed=random_seed, ratio_gap=ratio_gap, msg=msg)
+    if array_model or kind == 'HIGHS':
+        mip = mip_array.MIP(scenario.summary())
+    else:
+        mip = MIP(scenario.summary())
+    return DiscreteMIP(mip).solve(scenario, kind=kind, time_limit=time_limit, random_seed=random_seed,
+                                  ratio_gap=ratio_gap, msg=msg, tighten_horizon=tighten_horizon,
+                                  symmetries=symmetries, cumulative_precs=cumulative_precs,
+                                  cumulative_precs_cond=cumulative_precs_cond, threads=threads,
+                                  callback=callback, warm_start=warm_start)
 
 
 class DiscreteMIP:
@@ -83,17 +139,26 @@ class DiscreteMIP:
         self.task_groups = None
         self.resource_groups = None
         self.x = None  # mip variables shortcut
+        self.symmetries = False
+        self.cumulative_precs = False
+        self.cumulative_precs_cond = False
 
     def build_mip_from_scenario(self, msg=False):
         S = self.scenario
         mip = self.mip
-        self.task_groups = _get_task_groups(self.scenario)
-        #self.resource_groups = _get_resource_groups(self.scenario)
-        #group_resource = { R:R_group for R_group in self.resource_groups
-        #   for R in self.resource_groups[R_group] }
+        self.task_groups = _get_task_groups(self.scenario,self.symmetries)
+        # resource groups are replaced by their representatives
+        self.resource_groups = _get_resource_groups(self.scenario)
+        group_resource = { R:R_group for R_group in self.resource_groups
+            for R in self.resource_groups[R_group] }
+        def resources_req(T):
+            return [ [ R for R in RA if group_resource.get(R,R) == R ] for RA in T.resources_req ]
 
         x = dict()  # mip variables
         cons = list()  # log of constraints for debugging
+        # only create variables for starts inside the time windows, these also
+        # contain the bounds, so there are no constraints for them
+        windows = S.get_time_windows()
         for T in self.task_groups:
             task_group_size = len(self.task_groups[T])
             # base time-indexed variables
@@ -101,13 +166,12 @@ class DiscreteMIP:
             if task_group_size > 1:
                 cat = 'Integer'
             # single resource assignments restrict the periods directly
-            task_periods = set(S.get_periods(T))
-            task_resources_periods = \
-                [ set(S.get_periods(R))
-                for RA in T.resources_req if len(RA) == 1
-                for R in RA ]
-            if task_resources_periods:
-                task_periods &= set.intersection(*task_resources_periods)
+            earliest, latest = windows[T]
+            task_mask = S.get_start_mask(T) & ((1 << max(latest+1,0))-1) >> earliest << earliest
+            for RA in resources_req(T):
+                if len(RA) == 1:
+                    task_mask &= S.get_period_mask(RA[0])
+            task_periods = S.get_mask_periods(task_mask)
             x.update({ (T,t) : mip.var(str((T, t)), 0, task_group_size, cat) for t in task_periods })
             affine = [(x[T, t], 1) for t in task_periods ]
             # check if task is required
@@ -116,14 +180,15 @@ class DiscreteMIP:
             else:
                 cons.append(mip.con(affine, sense=-1, rhs=task_group_size))
 
-            for RA in T.resources_req:
+            for RA in resources_req(T):
                 # check if contains a single resource
                 if len(RA) <= 1:
                     continue
 
                 # create variables if necessary
                 x.update({ (T,R,t) : mip.var(str((T,R, t)),'Binary')
-                           for R in RA for t in S.get_periods(R) if (T,R,t) not in x})
+                           for R in RA for t in S.get_mask_periods(task_mask & S.get_period_mask(R))
+                           if (T,R,t) not in x})
 
                 '''
                 # create variables if necessary
@@ -142,7 +207,7 @@ class DiscreteMIP:
 
             # generate shortcuts for single resources
             x.update({ (T,R,t) : x[T,t]
-                for RA in T.resources_req if len(RA) == 1
+                for RA in resources_req(T) if len(RA) == 1
                 for R in RA for t in task_periods })
 
         # task requirements
@@ -227,46 +292,97 @@ class DiscreteMIP:
 
         # tasks are not allowed to be scheduled in the same resource at the same time
         coeffs = { (T,R) : RA[R] for T in S.tasks() for RA in T.resources_req for R in RA }
+        # index of the variables of each resource
+        resource_vars = collections.defaultdict(list)
+        for key in x:
+            if len(key) == 3:
+                resource_vars[key[1]].append(key)
+        zero_length = min( T.length for T in S.tasks() ) == 0
         for R in S.resources():
-            if R.size is not None:
+            if group_resource.get(R,R) != R:
+                continue
+            if R in self.resource_groups:
+                resource_size = len(self.resource_groups[R])
+            elif R.size is not None:
                 resource_size = R.size
             else:
                 resource_size = 1.0
-            for t in range(self.horizon):
-                # the max is for the case T.length == 1
-                affine = [ (x[T,R_,t_], coeffs[T,R])
-                    for T,R_,t_ in ( _ for _ in x if len(_) == 3 )
-                    if R_ == R and t+1-T.length <= t_ <= t
-                    ]
-                cons.append(mip.con(affine, sense=-1, rhs=resource_size))
+            # a variable is in the constraints of all periods which the task covers
+            affines = [ list() for t in range(self.horizon) ]
             # case of task of length zero, then can block tasks of length > 1
-            if min( T.length for T in S.tasks() ) == 0:
-                for t in range(1,self.horizon):
-                    affine = [ (x[T,R_,t_], coeffs[T,R])
-                        for T,R_,t_ in ( _ for _ in x if len(_) == 3 )
-                        if R_ == R
-                        and ( T.length == 0 or T.length > 1 )
-                        and t+1-max(T.length,1) <= t_ <= t
-                        ]
+            affines_zero = [ list() for t in range(self.horizon) ]
+            for T,R_,t_ in resource_vars[R]:
+                for t in range(max(t_,0),min(t_+T.length,self.horizon)):
+                    affines[t].append((x[T,R_,t_], coeffs[T,R]))
+                if zero_length and T.length != 1:
+                    for t in range(max(t_,1),min(t_+max(T.length,1),self.horizon)):
+                        affines_zero[t].append((x[T,R_,t_], coeffs[T,R]))
+            for affine in affines:
+                cons.append(mip.con(affine, sense=-1, rhs=resource_size))
+            if zero_length:
+                for affine in affines_zero[1:]:
                     cons.append(mip.con(affine, sense=-1, rhs=resource_size))
 
+        # projection of the start variables on the specified resource for the case
+        # that some resource is selected. This ensures that only the variables
+        # from this resource are taken in the constraints
+        def start_var(T,R,t):
+            if R is not None and (T,R,t) in x:
+                return x[T,R,t]
+            return x.get((T,t))
+
+        # variables which count the starts of a task until each period, so that
+        # precedences only need a constant number of variables per constraint.
+        # If strict is True, then only the starts on resource R are counted
+        started = dict()
+        def started_vars(T,R,strict=False):
+            if (T,R,strict) not in started:
+                started[T,R,strict] = list()
+                y = None
+                for t in range(self.horizon):
+                    x_t = x.get((T,R,t)) if strict else start_var(T,R,t)
+                    if x_t is not None:
+                        y_ = mip.var(str(('started',T,R,strict,t)), 0, len(self.task_groups[T]), 'Continuous')
+                        affine = [(y_,1),(x_t,-1)]
+                        if y is not None:
+                            affine += [(y,-1)]
+                        cons.append(mip.con(affine, sense=0, rhs=0))
+                        y = y_
+                    started[T,R,strict].append(y)
+            return started[T,R,strict]
+
+        def started_var(ys,t):
+            return ys[min(t,self.horizon-1)] if t >= 0 else None
+
         # lax precedence constraints
         for P in S.precs_lax():
             if P.task_left not in self.task_groups or P.task_right not in self.task_groups:
                 continue
-            # make projection x_ on specified resource for the case
-            # that some resource is selected. This ensures that only
-            # the variables from this resources are taken in the
-            # constraints
-            x_ = copy.copy(x)
-            if P.resource_left is not None:
-                for t_ in range(self.horizon):
-                    if (P.task_left,P.resource_left,t_) in x_:
-                        x_[P.task_left,t_] = x_[P.task_left,P.resource_left,t_]
-            if P.resource_right is not None:
-                for t_ in range(self.horizon):
-                    if (P.task_right,P.resource_right,t_) in x_:
-                        x_[P.task_right,t_] = x_[P.task_right,P.resource_right,t_]
+            if self.cumulative_precs:
+                left_size = float(len(self.task_groups[P.task_left]))
+                right_size = float(len(self.task_groups[P.task_right]))
+                y_left = started_vars(P.task_left,P.resource_left)
+                y_right = started_vars(P.task_right,P.resource_right)
+                rows = set()
+                for t in range(self.horizon):
+                    # same constraints as below with the sums replaced by the counts
+                    y_l = started_var(y_left,t-1)
+                    y_r = started_var(y_right,t+P.task_left.length+P.offset-1)
+                    # periods without starts give the same constraints
+                    if (id(y_l),id(y_r)) in rows:
+                        continue
+                    rows.add((id(y_l),id(y_r)))
+                    if P.resource_right is not None:
+                        affine = [ (y_l,1/left_size), (y_r,-1/right_size) ]
+                        affine = [ (a,b) for a,b in affine if a is not None ]
+                        cons.append(mip.con(affine, sense=1, rhs=0))
+                    if ( P.resource_left is not None or
+                        ( P.resource_left is None and P.resource_right is None ) ):
+                        affine = [ (y_left[-1],1/left_size), (y_l,-1/left_size),
+                                   (y_right[-1],-1/right_size), (y_r,1/right_size) ]
+                        affine = [ (a,b) for a,b in affine if a is not None ]
+                        cons.append(mip.con(affine, sense=-1, rhs=0))
+                continue
             #in the default case it is expected that the task groups have
             # similar size, so the first task in the left task group must be
             # scheduled before the first task in the right task group, and so on
@@ -277,24 +393,24 @@ class DiscreteMIP:
                 # the fix one needs to be larger than the optional one
                 if P.resource_right is not None:
                     affine = \
-                        [ (x_[P.task_left, t_],1/left_size)
+                        [ (start_var(P.task_left,P.resource_left,t_),1/left_size)
                         for t_ in range(t)
-                        if (P.task_left,t_) in x_ ]
+                        if (P.task_left,t_) in x ]
                     affine += \
-                        [ (x_[P.task_right, t_],-1/right_size)
+                        [ (start_var(P.task_right,P.resource_right,t_),-1/right_size)
                         for t_ in range(t+P.task_left.length+P.offset)
-                        if (P.task_right,t_) in x_ ]
+                        if (P.task_right,t_) in x ]
                     cons.append(mip.con(affine, sense=1, rhs=0))
                 if ( P.resource_left is not None or
                     ( P.resource_left is None and P.resource_right is None ) ):
                     affine = \
-                        [ (x_[P.task_left, t_],1/left_size)
+                        [ (start_var(P.task_left,P.resource_left,t_),1/left_size)
                         for t_ in range(t,self.horizon)
-                        if (P.task_left,t_) in x_ ]
+                        if (P.task_left,t_) in x ]
                     affine += \
-                        [ (x_[P.task_right, t_],-1/right_size)
+                        [ (start_var(P.task_right,P.resource_right,t_),-1/right_size)
                         for t_ in range(t+P.task_left.length+P.offset,self.horizon)
-                        if (P.task_right,t_) in x_ ]
+                        if (P.task_right,t_) in x ]
                     cons.append(mip.con(affine, sense=-1, rhs=0))
             # for the case that only one of the task groups has one task,
             # we need to distinguish two cases:
@@ -322,73 +438,14 @@ class DiscreteMIP:
             if P.task_left not in self.task_groups or P.task_right not in self.task_groups:
                 continue
 
-            # create projection
-            x_ = copy.copy(x)
-            if P.resource_left is not None:
-                for t_ in range(self.horizon):
-                    if (P.task_left,P.resource_left,t_) in x:
-                        x_[P.task_left,t_] = x_[P.task_left,P.resource_left,t_]
-            if P.resource_right is not None:
-                for t_ in range(self.horizon):
-                    if (P.task_right,P.resource_right,t_) in x:
-                        x_[P.task_right,t_] = x_[P.task_right,P.resource_right,t_]
-
             for t in range(self.horizon):
                 affine = []
                 if (P.task_left,t) in x:
-                    affine += [ (x_[P.task_left,t],1) ]
+                    affine += [ (start_var(P.task_left,P.resource_left,t),1) ]
                 if (P.task_right,t+P.task_left.length+P.offset) in x:
-                    affine += [ (x_[P.task_right,t+P.task_left.length+P.offset],-1) ]
+                    affine += [ (start_var(P.task_right,P.resource_right,t+P.task_left.length+P.offset),-1) ]
                 cons.append(mip.con(affine, sense=-1, rhs=0))
 
-        # low bounds
-        for P in S.bounds_low():
-            if P.task not in self.task_groups:
-                continue
-            affine = \
-                [ (x[P.task,t],1)
-                for t in range(P.bound)
-                if (P.task,t) in x ]
-            cons.append(mip.con(affine, sense=0, rhs=0))
-
-        # up bounds
-        for P in S.bounds_up():
-            if P.task not in self.task_groups:
-                continue
-            affine = \
-                [ (x[P.task,t],1)
-                for t in range(max(P.bound-P.task.length+1,0),self.horizon)
-                if (P.task,t) in x ]
-            cons.append(mip.con(affine, sense=0, rhs=0))
-
-        # tight low bounds
-        for P in S.bounds_low_tight():
-            if P.task not in self.task_groups:
-                continue
-            affine = \
-                [ (x[P.task,t],1)
-                for t in range(P.bound)
-                if (P.task,t) in x ]
-            affine += \
-                [ (x[P.task,t],1)
-                for t in range(P.bound+1,self.horizon)
-                if (P.task,t) in x ]
-            cons.append(mip.con(affine, sense=0, rhs=0))
-
-        # tight up bounds
-        for P in S.bounds_up_tight():
-            if P.task not in self.task_groups:
-                continue
-            affine = \
-                [ (x[P.task,t],1)
-                for t in range(P.bound-P.task.length)
-                if (P.task,t) in x ]
-            affine += \
-                [ (x[P.task,t],1)
-                for t in range(P.bound-P.task.length+1,self.horizon)
-                if (P.task,t) in x ]
-            cons.append(mip.con(affine, sense=0, rhs=0))
-
         # conditional precedence constraints
         for P in S.precs_cond():
             if P.task_left not in self.task_groups or P.task_right not in self.task_groups:
@@ -397,6 +454,29 @@ class DiscreteMIP:
             right_size = float(len(self.task_groups[P.task_right]))
             shared_resources = list(set(S.resources(task=P.task_left)) & set(S.resources(task=P.task_right)))
             for R in shared_resources:
+                if self.cumulative_precs_cond and min(left_size,right_size) == 1:
+                    # same constraints as below with the sums replaced by the counts
+                    y_left = started_vars(P.task_left,R,strict=True)
+                    y_right = started_vars(P.task_right,R,strict=True)
+                    rows = set()
+                    for t in range(self.horizon):
+                        if left_size == 1:
+                            if t == 0:
+                                continue
+                            y_l = started_var(y_left,t-P.offset-P.task_left.length-1)
+                            y_r = started_var(y_right,t-1)
+                            affine = [ (y_left[-1],1), (y_l,-1), (y_r,1/right_size) ]
+                        else:
+                            y_l = started_var(y_left,t-1)
+                            y_r = started_var(y_right,t+P.offset+P.task_left.length-1)
+                            affine = [ (y_left[-1],1/left_size), (y_l,-1/left_size), (y_r,1) ]
+                        # periods without starts give the same constraints
+                        if (id(y_l),id(y_r)) in rows:
+                            continue
+                        rows.add((id(y_l),id(y_r)))
+                        affine = [ (a,b) for a,b in affine if a is not None ]
+                        cons.append(mip.con(affine, sense=-1, rhs=1))
+                    continue
                 if left_size == 1:
                     for t in range(1,self.horizon):
                         # if the sum of x[P.task_left, R, t_] is one, then there is
@@ -443,11 +523,14 @@ class DiscreteMIP:
                 else:
                     end = S.horizon
                 coeff = C.SLA[SL]
-                affine = [ (x[T,R,t], coeff*SL.weight(T,t))
-                          for T in self.task_groups
-                          for t in range(start-T.length+1,end)
-                          if (T,R,t) in x
-                          and SL.weight(T,t) ]
+                affine = list()
+                for T in self.task_groups:
+                    for t in range(start-T.length+1,end):
+                        if (T,R,t) not in x:
+                            continue
+                        w = SL.weight(T,t)
+                        if w:
+                            affine.append((x[T,R,t], coeff*w))
                 if not affine:
                     continue
                 affines += affine
@@ -467,9 +550,11 @@ class DiscreteMIP:
                 coeff = C.SLA[SL] #TODO: is muliplying here correct as for sum
                 for T in self.task_groups:
                     for t in range(start-T.length+1,end):
-                        if (T,R,t) in x and SL.weight(T,t):
-                            affine_ = [ (x[T,R,t], coeff*SL.weight(T,t)) ]
-                            affines_.append(affine_)
+                        if (T,R,t) not in x:
+                            continue
+                        w = SL.weight(T,t)
+                        if w:
+                            affines_.append([ (x[T,R,t], coeff*w) ])
                 if affines_:
                     x['cap_%i'%count,R] = mip.var(str(('cap_%i'%count,R)), 0, C.bound)
                     x_ = x['cap_%i'%count,R]
@@ -543,6 +628,7 @@ class DiscreteMIP:
         objective += [
             (x[T,R,t],R.cost_per_period*T.length)
             for R in S.resources() if R.cost_per_period is not None
+            and group_resource.get(R,R) == R
             for T in S.tasks(resource=R)
             for t in S.get_periods(R)
             if (T,R,t) in x
@@ -592,16 +678,66 @@ class DiscreteMIP:
                     starts.remove((t, R))
                     T_.resources.append(R)
 
+        # distribute the tasks on the representative of a resource group
+        # on the resources of the group
+        for R in self.resource_groups:
+            resources = self.resource_groups[R]
+            if len(resources) <= 1:
+                continue
+            # heap of the end of the last task on each resource, the resource
+            # which gets free first can take the next task since the capacity
+            # of the representative is not exceeded
+            ends = [ (0,i) for i in range(len(resources)) ]
+            tasks = [ T for T in self.scenario.tasks()
+                      if T.start_value is not None and R in T.resources ]
+            for T in sorted(tasks,key=lambda T:T.start_value):
+                (end,i) = heapq.heappop(ends)
+                heapq.heappush(ends,(max(end,T.start_value+T.length),i))
+                T.resources[T.resources.index(R)] = resources[i]
+
+
+
+    def set_start_from_scenario(self):
+        """
+        use the start values and resources of the tasks as mip start
+        """
+        group_resource = { R:R_group for R_group in self.resource_groups
+            for R in self.resource_groups[R_group] }
+        starts = collections.Counter()
+        for T in self.task_groups:
+            for T_ in self.task_groups[T]:
+                if T_.start_value is None:
+                    continue
+                starts[T,T_.start_value] += 1
+                for R in T_.resources or []:
+                    starts[T,group_resource.get(R,R),T_.start_value] += 1
+        for key in starts:
+            if key in self.x:
+                self.mip.start(self.x[key],starts[key])
 
-
-    def solve(self, scenario, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0):
+    def solve(self, scenario, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0,
+              tighten_horizon=False, symmetries=False, cumulative_precs=None, cumulative_precs_cond=False,
+              threads=None, callback=None, warm_start=False):
 
         self.scenario = scenario
+        self.symmetries = symmetries
+        if cumulative_precs is None:
+            cumulative_precs = len(scenario.precs_lax()) > 100
+        self.cumulative_precs = cumulative_precs
+        self.cumulative_precs_cond = cumulative_precs_cond
         if self.scenario.horizon is None:
             raise Exception('ERROR: solver requires scenarios with defined horizon')
             return 0
-        self.horizon = self.scenario.horizon
-        self.build_mip_from_scenario(msg=msg)
+        horizon = self.scenario.horizon
+        if tighten_horizon:
+            self.scenario.tighten_horizon(msg=msg,apply=True)
+        try:
+            self.horizon = self.scenario.horizon
+            self.build_mip_from_scenario(msg=msg)
+        finally:
+            self.scenario.horizon = horizon
+        if warm_start:
+            self.set_start_from_scenario()
 
         # if time_limit :
         #   options += ['sec',str(time_limit),'ratioGap',str(0.1),'cuts','off',
@@ -615,6 +751,10 @@ class DiscreteMIP:
         #params['cuts'] = 'off'
         params['ratio_gap'] = str(ratio_gap)
         params['kind'] = kind
+        if threads is not None:
+            params['threads'] = threads
+        if callback is not None:
+            params['callback'] = callback
         self.mip.solve(msg=msg,**params)
 
         #print([ self.x[scenario['T1_e'],scenario['R1'],i].value() for i in range(scenario.horizon) ])
@@ -0,0 +1,298 @@
+#Copyright 2015 Tim Nonner
+#
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+
+import array
+import os
+import subprocess
+import tempfile
+import time
+
+__doc__ = """ an interface with the same methods as mip_pulp.MIP which keeps the model
+in arrays instead of pulp objects. Variables are column indices and the constraint
+matrix is stored in coordinate form, it can be written as MPS file or passed to an
+in-process solver. Requires numpy """
+
+class MIP:
+	"""
+	Array-based mip model
+	"""
+
+	def __init__(self,name,kind='Minimize'):
+		kinds = {'Minimize':1, 'Maximize':-1}
+		self.name = name
+		self.sense = kinds[kind]
+		# columns
+		self.names = list()
+		self.low = array.array('d')
+		self.up = array.array('d')
+		self.integer = array.array('b')
+		# constraint matrix in coordinate form and row bounds
+		self.rows = array.array('q')
+		self.cols = array.array('q')
+		self.coeffs = array.array('d')
+		self.row_low = array.array('d')
+		self.row_up = array.array('d')
+		self.objective = dict()
+		self.starts = dict()
+		self.values = None
+		self._status = 0
+
+	# same attribute as mip_pulp.MIP for printing the model
+	@property
+	def mip(self):
+		return self
+
+	def __str__(self):
+		return '%s: %i variables, %i constraints, %i nonzeros'%\
+			(self.name,len(self.names),len(self.row_low),len(self.coeffs))
+
+	def var(self,name,low=0,up=0,cat='Binary'):
+		# same bounds as pulp, binary variables ignore the given bounds
+		if cat == 'Binary':
+			low, up = 0, 1
+		self.names.append(name)
+		self.low.append(float('-inf') if low is None else low)
+		self.up.append(float('inf') if up is None else up)
+		self.integer.append(cat != 'Continuous')
+		return len(self.names)-1
+
+	def _compress_affine(self,affine):
+		# sum up coefficients of the same variable
+		affine_ = dict()
+		for a,b in affine:
+			affine_[a] = affine_.get(a,0)+b
+		return affine_
+
+	def con(self,affine,sense=0,rhs=0):
+		affine = self._compress_affine(affine)
+		row = len(self.row_low)
+		self.rows.extend([row]*len(affine))
+		self.cols.extend(affine.keys())
+		self.coeffs.extend(affine.values())
+		self.row_low.append(rhs if sense >= 0 else float('-inf'))
+		self.row_up.append(rhs if sense <= 0 else float('inf'))
+		return row
+
+	def obj(self,affine):
+		self.objective = self._compress_affine(affine)
+
+	def start(self,var,value):
+		# initial value of a variable for a mip start
+		self.starts[var] = value
+
+	def matrix(self):
+		"""
+		returns the rows, columns and coefficients of the constraint matrix as
+		numpy arrays sorted by columns
+		"""
+		import numpy as np
+		rows = np.frombuffer(self.rows,dtype=np.int64) if self.rows else np.zeros(0,dtype=np.int64)
+		cols = np.frombuffer(self.cols,dtype=np.int64) if self.cols else np.zeros(0,dtype=np.int64)
+		coeffs = np.frombuffer(self.coeffs) if self.coeffs else np.zeros(0)
+		order = np.lexsort((rows,cols))
+		return rows[order], cols[order], coeffs[order]
+
+	def costs(self):
+		import numpy as np
+		costs = np.zeros(len(self.names))
+		if self.objective:
+			costs[list(self.objective.keys())] = list(self.objective.values())
+		return costs*self.sense
+
+	def write_mps(self,path):
+		"""
+		writes the model as free MPS file, columns are named x0, x1, ... and rows
+		c0, c1, ... in the order of creation
+		"""
+		import numpy as np
+		rows, cols, coeffs = self.matrix()
+		costs = self.costs().tolist()
+		row_low = np.frombuffer(self.row_low) if self.row_low else np.zeros(0)
+		row_up = np.frombuffer(self.row_up) if self.row_up else np.zeros(0)
+		senses = np.where(np.isinf(row_low),'L',np.where(np.isinf(row_up),'G','E'))
+		starts = np.searchsorted(cols,np.arange(len(self.names)+1))
+		with open(path,'w') as f:
+			f.write('NAME %s\nROWS\n N obj\n'%'IntegerProgram')
+			f.write(''.join( ' %s c%i\n'%(sense,i) for i,sense in enumerate(senses) ))
+			f.write('COLUMNS\n')
+			integer = False
+			for j in range(len(self.names)):
+				if self.integer[j] != integer:
+					integer = self.integer[j]
+					f.write("    MARKER 'MARKER' '%s'\n"%('INTORG' if integer else 'INTEND'))
+				# columns without any nonzero are declared in the objective
+				if costs[j] or starts[j] == starts[j+1]:
+					f.write('    x%i obj %r\n'%(j,costs[j]))
+				f.write(''.join( '    x%i c%i %r\n'%(j,i,a) for i,a in
+								 zip(rows[starts[j]:starts[j+1]].tolist(),coeffs[starts[j]:starts[j+1]].tolist()) ))
+			if integer:
+				f.write("    MARKER 'MARKER' 'INTEND'\n")
+			f.write('RHS\n')
+			rhs = np.where(np.isinf(row_low),row_up,row_low)
+			f.write(''.join( '    rhs c%i %r\n'%(i,b) for i,b in enumerate(rhs.tolist()) if b ))
+			f.write('BOUNDS\n')
+			for j in range(len(self.names)):
+				low, up = self.low[j], self.up[j]
+				if low == up:
+					f.write(' FX bnd x%i %r\n'%(j,low))
+					continue
+				if low == float('-inf'):
+					f.write(' MI bnd x%i\n'%j)
+				elif low != 0:
+					f.write(' LO bnd x%i %r\n'%(j,low))
+				if up == float('inf'):
+					f.write(' PL bnd x%i\n'%j)
+				else:
+					f.write(' UP bnd x%i %r\n'%(j,up))
+			f.write('ENDATA\n')
+
+	def _read_cbc_solution(self,path):
+		import numpy as np
+		self.values = np.zeros(len(self.names))
+		with open(path) as f:
+			status = f.readline()
+			if status.startswith('Optimal') or \
+			   (status.startswith('Stopped') and 'objective value' in status):
+				self._status = 1
+			elif status.startswith('Infeasible') or status.startswith('Integer infeasible'):
+				self._status = -1
+			else:
+				self._status = 0
+			# only nonzero values are printed
+			for line in f:
+				fields = line.replace('**','').split(None,3)
+				self.values[int(fields[1][1:])] = float(fields[2])
+
+	def _solve_highs(self,msg=0,time_limit=None,random_seed=None,ratio_gap=None,threads=None,callback=None):
+		"""
+		solves the model in this process with HiGHS, the callback is called with
+		the objective value of each new incumbent and stops the solver if it
+		returns True
+		"""
+		import numpy as np
+		import highspy
+		rows, cols, coeffs = self.matrix()
+		lp = highspy.HighsLp()
+		lp.num_col_ = len(self.names)
+		lp.num_row_ = len(self.row_low)
+		lp.col_cost_ = self.costs()
+		lp.col_lower_ = np.frombuffer(self.low) if self.low else np.zeros(0)
+		lp.col_upper_ = np.frombuffer(self.up) if self.up else np.zeros(0)
+		lp.row_lower_ = np.frombuffer(self.row_low) if self.row_low else np.zeros(0)
+		lp.row_upper_ = np.frombuffer(self.row_up) if self.row_up else np.zeros(0)
+		lp.a_matrix_.format_ = highspy.MatrixFormat.kColwise
+		lp.a_matrix_.start_ = np.searchsorted(cols,np.arange(len(self.names)+1)).astype(np.int32)
+		lp.a_matrix_.index_ = rows.astype(np.int32)
+		lp.a_matrix_.value_ = coeffs
+		lp.integrality_ = [ highspy.HighsVarType.kInteger if integer else highspy.HighsVarType.kContinuous
+							for integer in self.integer ]
+		h = highspy.Highs()
+		h.setOptionValue('output_flag',bool(msg))
+		if time_limit is not None:
+			h.setOptionValue('time_limit',float(time_limit))
+		if random_seed is not None:
+			h.setOptionValue('random_seed',int(random_seed))
+		if ratio_gap is not None:
+			h.setOptionValue('mip_rel_gap',float(ratio_gap))
+		if threads is not None:
+			h.setOptionValue('threads',int(threads))
+		h.passModel(lp)
+		if self.starts:
+			h.setSolution(len(self.starts),np.array(list(self.starts.keys()),dtype=np.int32),
+						  np.array(list(self.starts.values()),dtype=np.float64))
+		if callback is not None:
+			def improving_solution(event):
+				if callback(event.data_out.objective_function_value*self.sense):
+					event.interrupt()
+			h.cbMipImprovingSolution.subscribe(improving_solution)
+		h.run()
+		model_status = h.getModelStatus()
+		if model_status in (highspy.HighsModelStatus.kInfeasible,highspy.HighsModelStatus.kUnboundedOrInfeasible):
+			self._status = -1
+		elif h.getInfo().primal_solution_status == 2: # feasible
+			self._status = 1
+		else:
+			self._status = 0
+		if self._status == 1:
+			self.values = np.array(h.getSolution().col_value)
+
+	def _cbc_path(self):
+		"""
+		the CBC binary which pulp.PULP_CBC_CMD runs in mip_pulp, or else the installed
+		one like pulp.COIN_CMD. The binary is looked up without creating a pulp solver
+		"""
+		import pulp as pl
+		path = getattr(pl.PULP_CBC_CMD,'pulp_cbc_path',None)
+		if path is not None and os.access(path,os.X_OK):
+			return path
+		return pl.COIN_CMD.executableExtension('cbc')
+
+	def solve(self,msg=0,**kwarg):
+		kind = kwarg.get('kind','CBC')
+		time_limit = kwarg.get('time_limit')
+		random_seed = kwarg.get('random_seed')
+		ratio_gap = kwarg.get('ratio_gap')
+		start_time = time.perf_counter()
+		if kind == 'CBC':
+			with tempfile.TemporaryDirectory() as tmp_dir:
+				path = os.path.join(tmp_dir,'model.mps')
+				solution_path = os.path.join(tmp_dir,'model.sol')
+				self.write_mps(path)
+				options = []
+				if time_limit is not None:
+					options.extend(['-sec', str(time_limit)])
+				if random_seed is not None:
+					options.extend(['-randomSeed', str(random_seed), '-randomCbcSeed', str(random_seed)])
+				if ratio_gap is not None:
+					options.extend(['-ratio', str(ratio_gap)])
+				if self.starts:
+					start_path = os.path.join(tmp_dir,'model.mst')
+					with open(start_path,'w') as f:
+						f.write('Stopped on time - objective value 0\n')
+						f.write(''.join( '%7i x%i %15r 0\n'%(j,j,float(value)) for j,value in self.starts.items() ))
+					options.extend(['-mips', start_path])
+				subprocess.run([self._cbc_path(), path]+options+['-solve','-solution',solution_path],
+							   stdout=None if msg else subprocess.DEVNULL,
+							   stderr=None if msg else subprocess.DEVNULL)
+				if os.path.exists(solution_path):
+					self._read_cbc_solution(solution_path)
+				else:
+					self._status = 0
+		elif kind == 'HIGHS':
+			self._solve_highs(msg=msg,time_limit=time_limit,random_seed=random_seed,ratio_gap=ratio_gap,
+							  threads=kwarg.get('threads'),callback=kwarg.get('callback'))
+		else:
+			raise Exception('ERROR: solver ' + kind + ' not known')
+
+		if msg:
+			print('INFO: execution time for solving mip (sec) = ' + str(time.perf_counter() - start_time))
+		if self._status == 1 and msg:
+			print('INFO: objective = ' + str(sum( self.values[a]*b for a,b in self.objective.items() )))
+
+	def status(self):
+		return self._status
+
+	def value(self,var):
+		if self.values is None:
+			return None
+		value = self.values[var]
+		if self.integer[var]:
+			return round(value)
+		return value
@@ -24,22 +24,31 @@ under the License.
 '''
 
 from .mip_pulp import MIP
+from . import mip_array
+from . import symmetry
 import collections
 
 
 
-def solve(scenario, bigm=10000, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0):
+def solve(scenario, bigm=10000, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0,
+		  symmetries=False, threads=None, callback=None, warm_start=False):
 	"""
 	Solves the given scenario using a bigm-type MIP
 
 	Args:
 		scenario:    scenario to solve
-		kind:        MIP-solver to use: CPLEX, GLPK, CBC or SCIP
+		kind:        MIP-solver to use: CPLEX, GLPK, CBC, SCIP or HIGHS
 		bigm :       a large number to allow a big-m type model
-		time_limit:  a time limit, only for CPLEX, CBC and SCIP
+		time_limit:  a time limit, only for CPLEX, CBC, SCIP and HIGHS
 		random_seed: random_seed
 		ratio_gap:   MIP-gap
 		msg:         0 means no feedback (default) during computation, 1 means feedback
+		symmetries:  order interchangeable tasks and resources, see solvers.symmetry
+		threads:     number of threads, only for HIGHS
+		callback:    function which is called with the objective value of each new solution
+		             and stops the solver if it returns True, only for HIGHS
+		warm_start:  use the current solution of the scenario as mip start, only for CBC
+		             and HIGHS
 
 	Returns:
 		scenario is solving was successful
@@ -47,9 +56,13 @@ def solve(scenario, bigm=10000, kind='CBC', time_limit=None, random_seed=None, r
 	"""
 
 	scenario.check()
-	mip = MIP(str(scenario))
+	if kind == 'HIGHS':
+		mip = mip_array.MIP(scenario.summary())
+	else:
+		mip = MIP(scenario.summary())
 	return ContinuousMIP(mip).solve(scenario, bigm=bigm, kind=kind, time_limit=time_limit, random_seed=random_seed,
-									ratio_gap=ratio_gap, msg=msg)
+									ratio_gap=ratio_gap, msg=msg, symmetries=symmetries, threads=threads,
+									callback=callback, warm_start=warm_start)
 
 
 class ContinuousMIP(object):
@@ -63,6 +76,7 @@ class ContinuousMIP(object):
 		self.horizon = None
 		self.bigm = None
 		self.x = None  # mip variables shortcut
+		self.symmetries = False
 
 
 	def build_mip_from_scenario(self, task_groups=None, msg=0):
@@ -77,8 +91,15 @@ class ContinuousMIP(object):
 		# task variables
 		x = dict()
 
+		# start domains from bounds and precedences, there are no constraints for bounds.
+		# An empty domain means that there is no solution, the model is not built then
+		windows = S.get_time_windows(periods=False)
+		if any( latest is not None and earliest > latest for earliest, latest in windows.values() ):
+			return False
 		for T in S.tasks():
-			x[T] = mip.var(str(T),up=self.horizon,cat='Continuous')#pl.LpVariable(str(T), 0)
+			earliest, latest = windows[T]
+			x[T] = mip.var(str(T),low=earliest,up=self.horizon if latest is None else latest,
+						   cat='Continuous')#pl.LpVariable(str(T), 0)
 			# add task vs resource variabls
 			for RA in T.resources_req:
 				for R in RA:
@@ -113,17 +134,11 @@ class ContinuousMIP(object):
 		#                                        if 'delay_cost' in T and T in x ])
 
 		# same resource variable
+		task_resources = { T : set(T.resources) if T.resources else set(S.resources(task=T))
+						   for T in S.tasks() }
 		task_pairs = [(T, T_) for T in S.tasks() for T_ in S.tasks() if str(T) < str(T_)]
 		for (T, T_) in task_pairs:
-			if T.resources:
-				resources = T.resources
-			else:
-				resources = S.resources(task=T)
-			if T_.resources:
-				resources_ = T_.resources
-			else:
-				resources_ = S.resources(task=T_)
-			shared_resources = list(set(resources) & set(resources_))
+			shared_resources = list(task_resources[T] & task_resources[T_])
 
 			# TODO: restrict the number of variables
 			if shared_resources:
@@ -188,30 +203,6 @@ class ContinuousMIP(object):
 			#                   (1 - x[(P.task_left, P.task_right)]) * BIGM + (1 - x[
 			#   (P.task_left, P.task_right, 'SameResource')]) * BIGM
 
-		# upper bounds
-		for P in S.bounds_up():
-			affine = [ (x[P.task],1) ]
-			cons.append(mip.con(affine,sense=-1,rhs=P.bound-P.task.length))
-			#mip += x[P.task] + P.task.length <= P.bound
-
-		# lower bounds
-		for P in S.bounds_low():
-			affine = [ (x[P.task],1) ]
-			cons.append(mip.con(affine,sense=1,rhs=P.bound))
-			#mip += x[P.task] >= P.bound
-
-		# tight upper bounds
-		for P in S.bounds_up_tight():
-			affine = [ (x[P.task],1) ]
-			cons.append(mip.con(affine,sense=0,rhs=P.bound-P.task.length))
-			#mip += x[P.task] + P.task.length == P.bound
-
-		# tight lower bounds
-		for P in S.bounds_low_tight():
-			affine = [ (x[P.task],1) ]
-			cons.append(mip.con(affine,sense=0,rhs=P.bound))
-			#mip += x[P.task] == P.bound
-
 		'''
 		# capacity lower bounds
 		for C in S.capacity_low():
@@ -236,6 +227,20 @@ class ContinuousMIP(object):
 			cons.append(mip.con(affine, sense=-1, rhs=C.bound))
 		'''
 
+		# symmetry breaking, interchangeable tasks start in order and interchangeable
+		# resources are used in the order of the tasks
+		if self.symmetries:
+			for tasks in symmetry.task_classes(S):
+				for T, T_ in zip(tasks,tasks[1:]):
+					affine = [ (x[T],1), (x[T_],-1) ]
+					cons.append(mip.con(affine,sense=-1,rhs=0))
+					if T.length > 0 and (T, T_) in x:
+						cons.append(mip.con([ (x[(T, T_)],1) ],sense=0,rhs=1))
+			for resources in symmetry.resource_classes(S):
+				for T, count in symmetry.resource_labels(S,resources).items():
+					for R in resources[count:]:
+						cons.append(mip.con([ (x[(T, R)],1) ],sense=0,rhs=0))
+
 		'''
 		for con in cons:
 			mip.add_con(con)
@@ -243,13 +248,27 @@ class ContinuousMIP(object):
 
 		self.mip = mip
 		self.x = x
+		return True
+
+	def set_start_from_scenario(self):
+		"""
+		use the start values and resources of the tasks as mip start
+		"""
+		for T in self.scenario.tasks():
+			if T.start_value is None:
+				continue
+			self.mip.start(self.x[T],T.start_value)
+			for R in T.resources or []:
+				if (T,R) in self.x:
+					self.mip.start(self.x[(T,R)],1)
 
 	def read_solution_from_mip(self, msg=0):
 		for T in self.scenario.tasks():
-			if self.x[T].varValue is None:
+			value = self.mip.value(self.x[T])
+			if value is None:
 				T.start_value = 0
 			else:
-				T.start_value = int(self.x[T].varValue)
+				T.start_value = int(round(value))
 			if T.resources:
 				resources = T.resources
 			else:
@@ -262,12 +281,19 @@ class ContinuousMIP(object):
 					task_resources.append(resource)
 			T.resources = task_resources
 
-	def solve(self, scenario, bigm=10000, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0):
+	def solve(self, scenario, bigm=10000, kind='CBC', time_limit=None, random_seed=None, ratio_gap=0.0, msg=0,
+			  symmetries=False, threads=None, callback=None, warm_start=False):
 
 		self.scenario = scenario
+		self.symmetries = symmetries
 		self.horizon = self.scenario.horizon
 		self.bigm = bigm
-		self.build_mip_from_scenario(msg=msg)
+		if not self.build_mip_from_scenario(msg=msg):
+			if msg:
+				print('ERROR: no solution found')
+			return 0
+		if warm_start:
+			self.set_start_from_scenario()
 
 		params = dict()
 		if time_limit is not None:
@@ -276,6 +302,10 @@ class ContinuousMIP(object):
 			params['random_seed'] = str(random_seed)
 		params['kind']= kind
 		params['ratio_gap'] = str(ratio_gap)
+		if threads is not None:
+			params['threads'] = threads
+		if callback is not None:
+			params['callback'] = callback
 		self.mip.solve(msg=msg,**params)
 		#_solve_mip(self.mip, kind=kind, params=params, msg=msg)
 
@@ -35,10 +35,16 @@ class MIP:
 	def __init__(self,name,kind='Minimize'):
 		kinds = {'Minimize':pl.LpMinimize, 'Maximize':pl.LpMaximize}
 		self.mip = pl.LpProblem('IntegerProgram', kinds[kind])
+		self.warm_start = False
 
 	def var(self,name,low=0,up=0,cat='Binary'):
 		return pl.LpVariable(name, low, up, cat=cat)
 
+	def start(self,var,value):
+		# initial value of a variable for a mip start, only for CBC
+		var.setInitialValue(value)
+		self.warm_start = True
+
 	def _compress_affine(self,affine):
 		# sum up (pulp doesnt do this)
 		affine_ = { a:0 for a,b in affine }
@@ -92,7 +98,7 @@ class MIP:
 			if ratio_gap is not None:
 				options.extend(['ratio', str(ratio_gap)])
 			if kind == 'CBC':
-				self.mip.solve(pl.PULP_CBC_CMD(msg=msg, options=options))
+				self.mip.solve(pl.PULP_CBC_CMD(msg=msg, options=options, warmStart=self.warm_start))
 			elif kind == 'COIN':
 				self.mip.solve(pl.COIN(msg=msg, options=options))
 		elif kind == 'GUROBI':
@@ -18,11 +18,15 @@
 #under the License.
 
 import collections
-import copy
 import sys
 
-def solve(scenario,time_limit=None,copy_scenario=False,msg=False) :
-    """ Integration of the ortools scheduling solver """
+from . import symmetry
+
+def solve(scenario,time_limit=None,copy_scenario=False,msg=False,symmetries=False) :
+    """
+    Integration of the ortools scheduling solver. If symmetries is True, then
+    interchangeable tasks and resources are ordered, see solvers.symmetry
+    """
     try:
         from ortools.constraint_solver import pywrapcp
     except ModuleNotFoundError:
@@ -30,7 +34,7 @@ def solve(scenario,time_limit=None,copy_scenario=False,msg=False) :
 
     S = scenario
     if copy_scenario :
-        S = copy.deepcopy(scenario)
+        S = scenario.fork()
 
     # create a Solver instance
     # see documentation at
@@ -50,12 +54,19 @@ def solve(scenario,time_limit=None,copy_scenario=False,msg=False) :
     # Map each Task to a FixedDurationIntervalVar
     # Documentation at
     # http://google.github.io/or-tools/python/ortools/constraint_solver/pywrapcp.html#pywrapcp.Solver.FixedDurationIntervalVar
+    # start domains from bounds and precedences
+    windows = S.get_time_windows(periods=False)
     for task in S.tasks():
         task_name = task.name
         task_is_optional = False  # it's not part of the Task class, but must be passed to the ort_solver
         task_length = task.length
-        lower_interval_bound = 0
-        upper_interval_bound = S.horizon - task.length
+        lower_interval_bound, upper_interval_bound = windows[task]
+        upper_interval_bound = min(upper_interval_bound, S.horizon - task.length)
+        # an empty start domain means that there is no solution
+        if lower_interval_bound > upper_interval_bound:
+            if msg:
+                print('ERROR: no solution found')
+            return False
         interval_from_task = ort_solver.FixedDurationIntervalVar(lower_interval_bound,
                                                                  upper_interval_bound,
                                                                  task_length,
@@ -101,6 +112,17 @@ def solve(scenario,time_limit=None,copy_scenario=False,msg=False) :
                 I_ = resource_task_to_interval[(R,T_)]
                 ort_solver.Add(I.PerformedExpr() == I_.PerformedExpr())
 
+    # symmetry breaking, interchangeable tasks start in order and interchangeable
+    # resources are used in the order of the tasks
+    if symmetries:
+        for tasks in symmetry.task_classes(S):
+            for T, T_ in zip(tasks,tasks[1:]):
+                ort_solver.Add(task_to_interval[T].StartExpr() <= task_to_interval[T_].StartExpr())
+        for resources in symmetry.resource_classes(S):
+            for T, count in symmetry.resource_labels(S,resources).items():
+                for R in resources[count:]:
+                    ort_solver.Add(resource_task_to_interval[(R,T)].PerformedExpr() == 0)
+
     # resources
     sequences = collections.OrderedDict()
     for R in S.resources():
@@ -1,7 +1,9 @@
 import os
 import time
 import re
+import shutil
 import subprocess
+import tempfile
 import pulp
 
 class SCIP_CMD(pulp.LpSolver_CMD):
@@ -24,12 +26,27 @@ class SCIP_CMD(pulp.LpSolver_CMD):
         if not self.executable(self.path):
             raise pulp.PulpSolverError("PuLP: cannot execute "+self.path)
         if not self.keepFiles:
-            pid = os.getpid()
-            tmpLp = os.path.join(self.tmpDir, "%d-pulp.lp" % pid)
-            tmpSol = os.path.join(self.tmpDir, "%d-pulp.sol" % pid)
+            # unique directory per call so that concurrent solves do not share files,
+            # on a RAM-backed file system if available
+            tmpDir = tempfile.mkdtemp(prefix="pulp-scip-", dir=self.ramDir())
+            tmpLp = os.path.join(tmpDir, "pulp.lp")
+            tmpSol = os.path.join(tmpDir, "pulp.sol")
         else:
             tmpLp = lp.name+"-pulp.lp"
             tmpSol = lp.name+"-pulp.sol"
+        try:
+            return self._solve(lp, tmpLp, tmpSol)
+        finally:
+            if not self.keepFiles:
+                shutil.rmtree(tmpDir, ignore_errors = True)
+
+    def ramDir(self):
+        """Directory for temporary files, /dev/shm if it is writable"""
+        if os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK | os.X_OK):
+            return "/dev/shm"
+        return self.tmpDir
+
+    def _solve(self, lp, tmpLp, tmpSol):
         lp.writeLP(tmpLp, writeSOS = 0)
         #proc = ["scip", "-c", "read \"%s\"" % tmpLp, "-c", "set limits time 180", "-c", "optimize", "-c", "write solution \"%s\"" % tmpSol, "-c", "quit"]
         proc = ["scip", "-c", "read \"%s\"" % tmpLp]
@@ -61,11 +78,6 @@ class SCIP_CMD(pulp.LpSolver_CMD):
             raise pulp.PulpSolverError("PuLP: Error while executing "+self.path)
         lp.status, values = self.readsol(tmpSol)
         lp.assignVarsVals(values)
-        if not self.keepFiles:
-            try: os.remove(tmpLp)
-            except: pass
-            try: os.remove(tmpSol)
-            except: pass
         return lp.status
 
     def readsol(self, filename):
@@ -96,9 +108,14 @@ class SCIP_CMD(pulp.LpSolver_CMD):
             status = scipStatus[statusString]
             f.readline() # objective value:
             values = {}
+            # variables which are left out are zero, so only nonzero values are kept
             for line in f:
-                name, val, _ = line.split()
-                values[name] = float(val)
+                fields = line.split(None, 2)
+                if len(fields) < 2:
+                    continue
+                val = float(fields[1])
+                if val:
+                    values[fields[0]] = val
         return status, values
 
 SCIP = SCIP_CMD
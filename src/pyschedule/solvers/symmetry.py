@@ -0,0 +1,137 @@
+#Copyright 2015 Tim Nonner
+#
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import collections
+
+from ..pyschedule import PrecedenceLax, _Precedence, _Bound, Capacity
+
+def _attributes(el) :
+    return tuple(sorted( (key,repr(value)) for key,value in vars(el).items() ))
+
+def _classes(elements,signatures) :
+    classes = collections.OrderedDict()
+    for el in elements :
+        if signatures.get(el) is not None :
+            classes.setdefault(signatures[el],[]).append(el)
+    return [ els for els in classes.values() if len(els) > 1 ]
+
+def task_classes(scenario,aggregate=False) :
+    """
+    returns the lists of at least two tasks of the scenario which are interchangeable, that
+    is, they have the same length, periods, costs, attributes, resource requirements and
+    constraints with other tasks. Tasks with groups, task requirements, tight or conditional
+    precedences are not considered. If aggregate is True, then tasks with precedences to
+    interchangeable tasks are left out too, since a task group only keeps the precedences of
+    its first task, see solvers.mip
+    """
+    S = scenario
+    tasks = S.tasks()
+    signatures = collections.OrderedDict()
+    for T in tasks :
+        if T.group is not None or T.tasks_req :
+            continue
+        periods = tuple(T.periods) if T.periods is not None else None
+        signatures[T] = [T.length,periods,T.schedule_cost,T.delay_cost,_attributes(T)]
+    for T in tasks :
+        for TR in T.tasks_req :
+            for T_ in getattr(TR,'map',[TR]) :
+                signatures.pop(T_,None)
+
+    # requirements which are shared by several tasks force them to the same resource
+    shared = collections.Counter( id(RA) for T in tasks for RA in T.resources_req )
+    index = dict()
+    for T in signatures :
+        reqs = [ ('shared',index.setdefault(id(RA),len(index))) if shared[id(RA)] > 1 else
+                 tuple(sorted( (R.name,RA[R]) for R in RA )) for RA in T.resources_req ]
+        signatures[T].append(tuple(sorted(reqs)))
+
+    constraints = collections.defaultdict(list)
+    for C in S.constraints() :
+        if isinstance(C,PrecedenceLax) :
+            resources = (str(C.resource_left),str(C.resource_right),C.offset)
+            constraints[C.task_left].append(('left',C.task_right.name)+resources)
+            constraints[C.task_right].append(('right',C.task_left.name)+resources)
+        elif isinstance(C,_Precedence) :
+            signatures.pop(C.task_left,None)
+            signatures.pop(C.task_right,None)
+        elif isinstance(C,_Bound) :
+            constraints[C.task].append((type(C).__name__,C.bound))
+    for T in signatures :
+        signatures[T] = tuple(signatures[T]+sorted(constraints[T]))
+
+    classes = _classes(tasks,signatures)
+    if aggregate :
+        in_class = { T for Ts in classes for T in Ts }
+        in_class.update( T for T in tasks if T.group is not None )
+        for C in S.precs_lax() :
+            if C.task_left in in_class and C.task_right in in_class :
+                signatures[C.task_left] = signatures[C.task_right] = None
+        classes = _classes(tasks,signatures)
+    return classes
+
+def resource_classes(scenario,groups=False) :
+    """
+    returns the lists of at least two resources of the scenario which are interchangeable,
+    that is, they have the same size, periods, costs and attributes, and each requirement
+    of a task contains either all of them with the same coefficient or none. Resources
+    which are used in constraints are not considered. If groups is True, then only
+    resources of the same group are considered, otherwise only resources without group
+    """
+    S = scenario
+    signatures = collections.OrderedDict()
+    for R in S.resources() :
+        if (R.group is not None) != groups :
+            continue
+        periods = tuple(R.periods) if R.periods is not None else None
+        signatures[R] = [R.group,R.size,periods,R.cost_per_period,_attributes(R)]
+    for C in S.constraints() :
+        if isinstance(C,_Precedence) :
+            resources = [C.resource_left,C.resource_right]
+        elif isinstance(C,Capacity) :
+            resources = [ SL.resource for SL in C.slices() ]
+        else :
+            resources = C.resources()
+        for R in resources :
+            signatures.pop(R,None)
+    for i,(T,RA) in enumerate( (T,RA) for T in S.tasks() for RA in T.resources_req ) :
+        for R in RA :
+            if R in signatures :
+                signatures[R].append((i,RA[R]))
+    for R in signatures :
+        signatures[R] = tuple(signatures[R])
+    return _classes(S.resources(),signatures)
+
+def resource_labels(scenario,resources) :
+    """
+    returns a mapping of the tasks which require the given interchangeable resources to
+    the number of these resources they can use when the resources are used in the order
+    of the tasks, that is, the first task only uses the first resource, and so on
+    """
+    S = scenario
+    labels = collections.OrderedDict()
+    count = 0
+    for T in S.tasks() :
+        reqs = [ RA for RA in T.resources_req if resources[0] in RA ]
+        if not reqs :
+            continue
+        count += len(reqs)
+        if count >= len(resources) :
+            break
+        labels[T] = count
+    return labels
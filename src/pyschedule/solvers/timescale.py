@@ -0,0 +1,144 @@
+#Copyright 2015 Tim Nonner
+#
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+import math
+
+from ..pyschedule import _Precedence, _Bound, Capacity
+
+def _period_bounds(periods) :
+    """
+    returns the first period and the period after the last one of each run of
+    consecutive periods
+    """
+    bounds = list()
+    periods = sorted(set(periods))
+    for i,t in enumerate(periods) :
+        if i == 0 or periods[i-1] != t-1 :
+            bounds.append(t)
+        if i == len(periods)-1 or periods[i+1] != t+1 :
+            bounds.append(t+1)
+    return bounds
+
+def _scale_periods(periods,scale) :
+    if periods is None :
+        return None
+    return sorted({ t//scale for t in periods })
+
+def _length_slices(C) :
+    """
+    returns True if all slices of C weight the length of tasks, False if none does
+    and None otherwise, in which case the constraint cannot be scaled
+    """
+    params = { SL._param == 'length' for SL in C.slices() }
+    if len(params) > 1 :
+        return None
+    return params.pop() if params else False
+
+def time_scale(scenario) :
+    """
+    returns the greatest common divisor of all task lengths, offsets, bounds, period
+    boundaries and slices of the given scenario. The length of the makespan task is
+    ignored, see Scenario.use_makespan_objective. Returns 1 if some constraint cannot
+    be scaled
+    """
+    S = scenario
+    values = list()
+    for T in S.tasks() :
+        if T.name != 'MakeSpan' :
+            values.append(T.length)
+        if T.periods is not None :
+            values += _period_bounds(T.periods)
+    for R in S.resources() :
+        if R.periods is not None :
+            values += _period_bounds(R.periods)
+    for C in S.constraints() :
+        if isinstance(C,_Precedence) :
+            values.append(C.offset)
+        elif isinstance(C,_Bound) :
+            values.append(C.bound)
+        elif isinstance(C,Capacity) :
+            length = _length_slices(C)
+            if length is None :
+                return 1
+            if length :
+                values.append(C.bound)
+            values += [ t for SL in C.slices() for t in (SL._start,SL._end) if t is not None ]
+    scale = 0
+    for value in values :
+        if value != int(value) :
+            return 1
+        scale = math.gcd(scale,int(value))
+    return max(scale,1)
+
+def solve(scenario,solve_method,msg=0) :
+    """
+    Divides all temporal quantities of the scenario by their greatest common divisor,
+    see time_scale, solves the smaller scenario with solve_method and writes the
+    solution back to the given scenario. Delay costs and costs per period are
+    scaled up so that objective values do not change
+
+    Arguments:
+        scenario     : the scenario to solve
+        solve_method : the solve method to use, e.g. solvers.mip.solve
+    """
+    S = scenario
+    scale = time_scale(S)
+    if msg :
+        print('INFO: time scale of scenario %s is %i'%(S.name,scale))
+    if scale == 1 :
+        return solve_method(S)
+
+    # the fork copies all elements and constraints which refer to them
+    S_ = S.fork()
+    if S_.horizon is not None :
+        S_.horizon = -(-S_.horizon//scale)
+    for T in S_.tasks() :
+        if T.name != 'MakeSpan' :
+            T.length //= scale
+        T.periods = _scale_periods(T.periods,scale)
+        if T.delay_cost is not None :
+            T.delay_cost *= scale
+    for R in S_.resources() :
+        R.periods = _scale_periods(R.periods,scale)
+        if R.cost_per_period is not None :
+            R.cost_per_period *= scale
+    constraints = S_.constraints()
+    S_.clear_constraints()
+    for C in constraints :
+        if isinstance(C,_Precedence) :
+            C.offset //= scale
+        elif isinstance(C,_Bound) :
+            C.bound //= scale
+        elif isinstance(C,Capacity) :
+            if _length_slices(C) :
+                C.bound //= scale
+            for SL in C.slices() :
+                if SL._start is not None :
+                    SL._start //= scale
+                if SL._end is not None :
+                    SL._end //= scale
+        S_ += C
+
+    result = solve_method(S_)
+    resources = { R.name : R for R in S.resources() }
+    for T in S.tasks() :
+        T_ = S_[T.name]
+        T.start_value = T_.start_value*scale if T_.start_value is not None else None
+        T.resources = [ resources[R.name] for R in T_.resources ] if T_.resources is not None else None
+    return result
@@ -20,7 +20,6 @@
 __doc__ = """Z3 SMT solver"""
 
 import collections
-import copy
 import sys
 
 try:
@@ -44,7 +43,7 @@ def solve(scenario,time_limit=None,copy_scenario=False,msg=False) :
     """ Integration of the ortools scheduling solver """
     S = scenario
     if copy_scenario :
-        S = copy.deepcopy(scenario)
+        S = scenario.fork()
 
     # create a Solver instance
     smt_solver = Solver()
@@ -0,0 +1,531 @@
+#Copyright 2015 Tim Nonner
+#
+#Licensed to the Apache Software Foundation (ASF) under one
+#or more contributor license agreements.  See the NOTICE file
+#distributed with this work for additional information
+#regarding copyright ownership.  The ASF licenses this file
+#to you under the Apache License, Version 2.0 (the
+#"License"); you may not use this file except in compliance
+#with the License.  You may obtain a copy of the License at
+#
+#  http://www.apache.org/licenses/LICENSE-2.0
+#
+#Unless required by applicable law or agreed to in writing,
+#software distributed under the License is distributed on an
+#"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+#KIND, either express or implied.  See the License for the
+#specific language governing permissions and limitations
+#under the License.
+
+__doc__ = """ a compact columnar file format for scenarios
+
+A file starts with a magic string, the size of the header and a JSON header
+which describes the scenario and the tables tasks, resources, requirements,
+alternatives (members of resource alternatives like R1|R2) and constraints.
+The columns of these tables follow as raw blocks that are memory-mapped
+when the file is opened, so ScenarioFile gives access to the columns of a
+large scenario without creating a python object for every task.
+"""
+
+import array
+import datetime
+import json
+import mmap
+import struct
+import sys
+
+from .pyschedule import Scenario, Task, Resource, _TaskAffine, _ResourceAffine, \
+    _Slice, _SliceAffine, Capacity, PrecedenceLax, PrecedenceTight, PrecedenceCond, \
+    BoundLow, BoundUp, BoundLowTight, BoundUpTight, _Precedence, _Bound, _pause_gc
+
+_MAGIC = b'PYSCHED1'
+_VERSION = 1
+_ALIGN = 8
+_CONSTRAINT_CLASSES = [PrecedenceLax, PrecedenceTight, PrecedenceCond,
+                       BoundLow, BoundUp, BoundLowTight, BoundUpTight, Capacity]
+
+
+def _encode_json(obj):
+    if isinstance(obj, datetime.datetime):
+        return {'__datetime__': obj.isoformat()}
+    if isinstance(obj, datetime.date):
+        return {'__date__': obj.isoformat()}
+    if isinstance(obj, datetime.timedelta):
+        return {'__timedelta__': [obj.days, obj.seconds, obj.microseconds]}
+    if isinstance(obj, range):
+        return {'__range__': [obj.start, obj.stop, obj.step]}
+    if isinstance(obj, (set, frozenset)):
+        return {'__set__': _tag_tuples(list(obj))}
+    raise TypeError('ERROR: %s of type %s cannot be stored'%(str(obj), type(obj).__name__))
+
+
+def _decode_json(obj):
+    if '__datetime__' in obj:
+        return datetime.datetime.fromisoformat(obj['__datetime__'])
+    if '__date__' in obj:
+        return datetime.date.fromisoformat(obj['__date__'])
+    if '__timedelta__' in obj:
+        return datetime.timedelta(*obj['__timedelta__'])
+    if '__range__' in obj:
+        return range(*obj['__range__'])
+    if '__set__' in obj:
+        return set(obj['__set__'])
+    if '__tuple__' in obj:
+        return tuple(obj['__tuple__'])
+    return obj
+
+
+def _tag_tuples(value):
+    """
+    json writes tuples as lists, so they are tagged to be restored as tuples
+    """
+    if isinstance(value, tuple):
+        return {'__tuple__': [ _tag_tuples(v) for v in value ]}
+    if isinstance(value, list):
+        if any( isinstance(v, (tuple, list, dict)) for v in value ):
+            return [ _tag_tuples(v) for v in value ]
+        return value
+    if isinstance(value, dict):
+        return { k: _tag_tuples(v) for k, v in value.items() }
+    return value
+
+
+def _dumps(value):
+    return json.dumps(_tag_tuples(value), default=_encode_json, separators=(',',':'))
+
+
+def _loads(s):
+    return json.loads(s, object_hook=_decode_json)
+
+
+def _encode_strings(strings):
+    blobs = [ s.encode('utf-8') for s in strings ]
+    offsets = array.array('q', [0])
+    total = 0
+    for blob in blobs:
+        total += len(blob)
+        offsets.append(total)
+    return offsets, array.array('B', b''.join(blobs))
+
+
+def _encode_column(values, present=None):
+    """
+    Returns the kind of the column (int, float, str or json) and its blocks.
+    None values are kept in a mask, present marks which elements exist at all
+    """
+    blocks = dict()
+    non_null = [ v for v in values if v is not None ]
+    if len(non_null) < len(values):
+        blocks['mask'] = array.array('B', [ v is not None for v in values ])
+    if present is not None and not all(present):
+        blocks['present'] = array.array('B', present)
+    types = { type(v) for v in non_null }
+    if types <= {int}:
+        try:
+            blocks['data'] = array.array('q', [ 0 if v is None else v for v in values ])
+            return 'int', blocks
+        except OverflowError:
+            pass
+    if types <= {float}:
+        blocks['data'] = array.array('d', [ 0.0 if v is None else v for v in values ])
+        return 'float', blocks
+    if types <= {str}:
+        blocks['offsets'], blocks['blob'] = _encode_strings([ '' if v is None else v for v in values ])
+        return 'str', blocks
+    blocks.pop('mask', None)
+    blocks['offsets'], blocks['blob'] = _encode_strings([ _dumps(v) for v in values ])
+    return 'json', blocks
+
+
+class _Column:
+    """
+    A lazy column of a table, elements are only decoded when accessed.
+    The blocks are memoryviews, e.g. use numpy.asarray(column.data) for
+    a numpy view without copying
+    """
+    def __init__(self, kind, length, blocks):
+        self.kind = kind
+        self.length = length
+        self.data = blocks.get('data')
+        self.mask = blocks.get('mask')
+        self.present = blocks.get('present')
+        self.offsets = blocks.get('offsets')
+        self.blob = blocks.get('blob')
+
+    def __len__(self):
+        return self.length
+
+    def is_present(self, i):
+        return self.present is None or bool(self.present[i])
+
+    def __getitem__(self, i):
+        if self.mask is not None and not self.mask[i]:
+            return None
+        if self.kind in ('int','float'):
+            return self.data[i]
+        s = str(self.blob[self.offsets[i]:self.offsets[i+1]], 'utf-8')
+        if self.kind == 'json':
+            return _loads(s)
+        return s
+
+    def __iter__(self):
+        return (self[i] for i in range(self.length))
+
+    def tolist(self):
+        if self.kind in ('int','float') and self.mask is None:
+            return self.data.tolist()
+        return list(self)
+
+
+class _Writer:
+    """
+    Collects the tables of a scenario file
+    """
+    def __init__(self):
+        self.tables = dict()
+        self.blocks = list()
+        self.size = 0
+
+    def table(self, name, length, columns, present=None):
+        """
+        columns: mapping of column names to lists of values
+        present: optional mapping of column names to presence flags
+        """
+        if present is None:
+            present = dict()
+        table = { 'length': length, 'columns': dict() }
+        for col in columns:
+            kind, blocks = _encode_column(columns[col], present.get(col))
+            table['columns'][col] = { 'kind': kind, 'blocks': dict() }
+            for part in blocks:
+                arr = blocks[part]
+                table['columns'][col]['blocks'][part] = [arr.typecode, self.size, len(arr)]
+                data = arr.tobytes()
+                data += b'\0'*(-len(data) % _ALIGN)
+                self.blocks.append(data)
+                self.size += len(data)
+        self.tables[name] = table
+
+    def write(self, path, meta):
+        header = dict(meta)
+        header['version'] = _VERSION
+        header['byteorder'] = sys.byteorder
+        header['tables'] = self.tables
+        header = _dumps(header).encode('utf-8')
+        header += b' '*(-(len(_MAGIC)+8+len(header)) % _ALIGN)
+        with open(path, 'wb') as f:
+            f.write(_MAGIC)
+            f.write(struct.pack('<Q', len(header)))
+            f.write(header)
+            for data in self.blocks:
+                f.write(data)
+
+
+def _attributes(elements):
+    """
+    Returns the columns and presence flags of the user-defined attributes
+    """
+    names = list()
+    for el in elements:
+        for attr in getattr(el, '__dict__', ()):
+            if attr not in names:
+                names.append(attr)
+    columns = dict()
+    present = dict()
+    for attr in names:
+        columns['attr.'+attr] = [ el.__dict__.get(attr) for el in elements ]
+        present['attr.'+attr] = [ attr in el.__dict__ for el in elements ]
+    return columns, present
+
+
+@_pause_gc
+def save(scenario, path):
+    """
+    Writes the given scenario, including constraints and solution, to path
+    """
+    S = scenario
+    tasks = S.tasks()
+    resources = S.resources()
+    task_index = { T: i for i, T in enumerate(tasks) }
+    resource_index = { R: i for i, R in enumerate(resources) }
+
+    def resource_id(R):
+        if R not in resource_index:
+            raise Exception('ERROR: resource %s is not contained in scenario %s'%(str(R), str(S.name)))
+        return resource_index[R]
+
+    def task_id(T):
+        if T not in task_index:
+            raise Exception('ERROR: task %s is not contained in scenario %s'%(str(T), str(S.name)))
+        return task_index[T]
+
+    def encode_resource(R):
+        # resource of a precedence, e.g. T1*R < T2
+        if R is None:
+            return None
+        if isinstance(R, _ResourceAffine):
+            return [ [resource_id(R_), R[R_]] for R_ in R ]
+        return resource_id(R)
+
+    def encode_tasks_req(T):
+        if not T.tasks_req:
+            return None
+        return [ task_id(TR) if isinstance(TR, Task)
+                 else [ [task_id(T_), TR[T_], encode_resource(TR.map_obj.get(T_))] for T_ in TR ]
+                 for TR in T.tasks_req ]
+
+    w = _Writer()
+
+    columns, present = _attributes(resources)
+    columns.update({
+        'name': [ R.name for R in resources ],
+        'size': [ R.size for R in resources ],
+        'group': [ R.group for R in resources ],
+        'periods': [ R.periods for R in resources ],
+        'cost_per_period': [ R.cost_per_period for R in resources ],
+        })
+    w.table('resources', len(resources), columns, present)
+
+    columns, present = _attributes(tasks)
+    columns.update({
+        'name': [ T.name for T in tasks ],
+        'length': [ T.length for T in tasks ],
+        'group': [ T.group for T in tasks ],
+        'periods': [ T.periods for T in tasks ],
+        'schedule_cost': [ T.schedule_cost for T in tasks ],
+        'delay_cost': [ T.delay_cost for T in tasks ],
+        'tasks_req': [ encode_tasks_req(T) for T in tasks ],
+        'start_value': [ T.start_value for T in tasks ],
+        'resources': [ None if T.resources is None else [ resource_id(R) for R in T.resources ]
+                       for T in tasks ],
+        })
+    w.table('tasks', len(tasks), columns, present)
+
+    # resource alternatives are shared by tasks with joint requirements, so keep their identity
+    alternative_index = dict()
+    req_task, req_alt = list(), list()
+    alt_id, alt_resource, alt_coeff = list(), list(), list()
+    for T in tasks:
+        for RA in T.resources_req:
+            if RA not in alternative_index:
+                alternative_index[RA] = len(alternative_index)
+                for R in RA:
+                    alt_id.append(alternative_index[RA])
+                    alt_resource.append(resource_id(R))
+                    alt_coeff.append(RA[R])
+            req_task.append(task_index[T])
+            req_alt.append(alternative_index[RA])
+    w.table('requirements', len(req_task), {'task': req_task, 'alternative': req_alt})
+    w.table('alternatives', len(alt_id),
+            {'alternative': alt_id, 'resource': alt_resource, 'coeff': alt_coeff})
+
+    constraints = S.constraints()
+    kind, task_left, task_right, value, spec = list(), list(), list(), list(), list()
+    for C in constraints:
+        kind.append(_CONSTRAINT_CLASSES.index(type(C)))
+        if isinstance(C, _Precedence):
+            task_left.append(task_id(C.task_left))
+            task_right.append(task_id(C.task_right))
+            value.append(C.offset)
+            if C.resource_left is None and C.resource_right is None:
+                spec.append(None)
+            else:
+                spec.append([encode_resource(C.resource_left), encode_resource(C.resource_right)])
+        elif isinstance(C, _Bound):
+            task_left.append(task_id(C.task))
+            task_right.append(None)
+            value.append(C.bound)
+            spec.append(None)
+        else:
+            task_left.append(None)
+            task_right.append(None)
+            value.append(C.bound)
+            spec.append([ [resource_id(SL.resource), SL._param, SL._start, SL._end,
+                           SL.kind, SL.name, C.SLA[SL]] for SL in C.SLA ])
+    w.table('constraints', len(constraints),
+            {'kind': kind, 'task_left': task_left, 'task_right': task_right,
+             'value': value, 'spec': spec})
+
+    meta = { 'scenario': { 'name': S.name, 'horizon': S.horizon, 'start_time': S.start_time,
+                           'end_time': S.end_time, 'steptime': S.steptime, 'duration': S.duration },
+             'constraint_classes': [ cls.__name__ for cls in _CONSTRAINT_CLASSES ] }
+    w.write(path, meta)
+
+
+class ScenarioFile:
+    """
+    A scenario file opened with memory-mapping. Columns are only read from
+    disk when accessed, and scenario() creates the python objects
+    """
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._views = list()
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self._mmap[:len(_MAGIC)] != _MAGIC:
+                raise Exception('ERROR: %s is not a scenario file'%str(path))
+            header_size, = struct.unpack('<Q', self._mmap[len(_MAGIC):len(_MAGIC)+8])
+            self._data_start = len(_MAGIC)+8+header_size
+            self.header = _loads(str(self._mmap[len(_MAGIC)+8:self._data_start], 'utf-8'))
+        except Exception:
+            self.close()
+            raise
+        if self.header['version'] != _VERSION:
+            self.close()
+            raise Exception('ERROR: unsupported scenario file version %s'%str(self.header['version']))
+        self._swap = self.header['byteorder'] != sys.byteorder
+        self.meta = self.header['scenario']
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        for view in self._views:
+            view.release()
+        self._views = list()
+        if getattr(self, '_mmap', None) is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def _block(self, typecode, offset, length):
+        start = self._data_start+offset
+        size = length*array.array(typecode).itemsize
+        if self._swap and typecode != 'B':
+            arr = array.array(typecode)
+            arr.frombytes(self._mmap[start:start+size])
+            arr.byteswap()
+            return memoryview(arr)
+        view = memoryview(self._mmap)[start:start+size]
+        self._views.append(view)
+        view = view.cast(typecode)
+        self._views.append(view)
+        return view
+
+    def tables(self):
+        return list(self.header['tables'])
+
+    def columns(self, table):
+        """
+        Returns the names of the columns of table, user-defined attributes
+        are prefixed with attr.
+        """
+        return list(self.header['tables'][table]['columns'])
+
+    def __len__(self):
+        return self.header['tables']['tasks']['length']
+
+    def column(self, table, name):
+        """
+        Returns the lazy column name of table
+        """
+        table = self.header['tables'][table]
+        col = table['columns'][name]
+        blocks = { part: self._block(*col['blocks'][part]) for part in col['blocks'] }
+        return _Column(col['kind'], table['length'], blocks)
+
+    @_pause_gc
+    def scenario(self):
+        """
+        Creates the scenario stored in this file
+        """
+        meta = self.meta
+        S = Scenario(meta['name'], horizon=meta['horizon'], start_time=meta['start_time'],
+                     end_time=meta['end_time'], steptime=meta['steptime'], duration=meta['duration'])
+
+        def attributes(table, elements):
+            for col in self.columns(table):
+                if not col.startswith('attr.'):
+                    continue
+                column = self.column(table, col)
+                attr = col[len('attr.'):]
+                for i, el in enumerate(elements):
+                    if column.is_present(i):
+                        setattr(el, attr, column[i])
+
+        col = lambda table, name: self.column(table, name).tolist()
+        resources = list()
+        for name, size, group, periods, cost_per_period in \
+                zip(col('resources','name'), col('resources','size'), col('resources','group'),
+                    col('resources','periods'), col('resources','cost_per_period')):
+            R = Resource(name, size=size, group=group, periods=periods, cost_per_period=cost_per_period)
+            S.add_resource(R)
+            resources.append(R)
+        attributes('resources', resources)
+
+        tasks = list(S.add_tasks(col('tasks','name'), lengths=col('tasks','length'),
+                            groups=col('tasks','group'), schedule_costs=col('tasks','schedule_cost'),
+                            delay_costs=col('tasks','delay_cost')))
+        # set directly, a column of periods would be ambiguous for add_tasks
+        for T, periods in zip(tasks, col('tasks','periods')):
+            T.periods = periods
+        attributes('tasks', tasks)
+
+        def decode_resource(R):
+            if R is None or isinstance(R, int):
+                return None if R is None else resources[R]
+            RA = _ResourceAffine(resources[R[0][0]])
+            for R_, coeff in R:
+                RA[resources[R_]] = coeff
+            return RA
+
+        for T, start_value, resources_, tasks_req in \
+                zip(tasks, col('tasks','start_value'), col('tasks','resources'), col('tasks','tasks_req')):
+            T.start_value = start_value
+            T.resources = None if resources_ is None else [ resources[R] for R in resources_ ]
+            for TR in tasks_req or []:
+                if isinstance(TR, int):
+                    T.tasks_req.append(tasks[TR])
+                    continue
+                TA = _TaskAffine(tasks[TR[0][0]])
+                for T_, coeff, R in TR:
+                    TA.map[tasks[T_]] = coeff
+                    TA.map_obj[tasks[T_]] = decode_resource(R)
+                T.tasks_req.append(TA)
+
+        alternatives = list()
+        for alt, R, coeff in zip(col('alternatives','alternative'), col('alternatives','resource'),
+                                 col('alternatives','coeff')):
+            if alt == len(alternatives):
+                alternatives.append(_ResourceAffine(resources[R]))
+            alternatives[alt][resources[R]] = coeff
+        for T, alt in zip(col('requirements','task'), col('requirements','alternative')):
+            tasks[T].resources_req.append(alternatives[alt])
+            tasks[T]._link_resources_req(alternatives[alt])
+
+        classes = [ _CONSTRAINT_CLASSES[[cls.__name__ for cls in _CONSTRAINT_CLASSES].index(name)]
+                    for name in self.header['constraint_classes'] ]
+        for kind, task_left, task_right, value, spec in \
+                zip(col('constraints','kind'), col('constraints','task_left'), col('constraints','task_right'),
+                    col('constraints','value'), col('constraints','spec')):
+            cls = classes[kind]
+            if issubclass(cls, _Precedence):
+                resource_left, resource_right = spec if spec is not None else (None, None)
+                C = cls(task_left=tasks[task_left], resource_left=decode_resource(resource_left),
+                        task_right=tasks[task_right], resource_right=decode_resource(resource_right),
+                        offset=value)
+            elif issubclass(cls, _Bound):
+                C = cls(task=tasks[task_left], bound=value)
+            else:
+                SLA = None
+                for R, param, start, end, slice_kind, name, coeff in spec:
+                    SL = _Slice(resource=resources[R])
+                    SL._param, SL._start, SL._end, SL.kind, SL.name = param, start, end, slice_kind, name
+                    if SLA is None:
+                        SLA = _SliceAffine(SL)
+                    SLA[SL] = coeff
+                C = cls(SLA=SLA, bound=value)
+            S._index_constraint(C._key(), C)
+        return S
+
+
+def load(path):
+    """
+    Reads the scenario stored in path
+    """
+    with ScenarioFile(path) as f:
+        return f.scenario()
@@ -17,10 +17,34 @@
 #specific language governing permissions and limitations
 #under the License.
 
+import copy
+import datetime
+import io
+import os
+import pickle
+import tempfile
+import time
 import unittest
 import warnings
 
+try:
+    import numpy as np
+except ModuleNotFoundError:
+    np = None
+
+try:
+    import pandas as pd
+except ModuleNotFoundError:
+    pd = None
+
+try:
+    import highspy
+except ModuleNotFoundError:
+    highspy = None
+
 from pyschedule import Scenario, Task, Resource, solvers
+from pyschedule.pyschedule import _Precedence
+from pyschedule.storage import ScenarioFile
 
 class TestFeatures(unittest.TestCase):
     def test_create_scenario(self) -> None:
@@ -99,5 +123,635 @@ class TestFeatures(unittest.TestCase):
         task += res1, res2  # means res1 and res2 are required for task to be processed
         self.assertEqual(len(task.resources_req), 2)
 
+    def test_duplicate_constraints(self) -> None:
+        scenario = Scenario('Scenario_8')
+        res = scenario.Resource('R')
+        task1, task2 = scenario.Task('T1'), scenario.Task('T2')
+        scenario += task1 < task2
+        # structurally equal constraints are only added once
+        scenario += task1 < task2
+        scenario += task1 + 1 < task2
+        scenario += task1*res < task2
+        scenario += res['length'][:3] <= 1
+        scenario += res['length'][:3] <= 1
+        self.assertEqual(len(scenario.precs_lax()), 3)
+        self.assertEqual(len(scenario.capacity()), 1)
+        self.assertIn(task1 < task2, scenario)
+        scenario -= task1 < task2
+        self.assertNotIn(task1 < task2, scenario)
+        self.assertEqual(len(scenario.constraints()), 3)
+        with self.assertRaises(Exception):
+            scenario -= task1 < task2
+
+    def test_constraints_by_class(self) -> None:
+        scenario = Scenario('Scenario_9')
+        task1, task2, task3 = scenario.Task('T1'), scenario.Task('T2'), scenario.Task('T3')
+        scenario += task1 < task2, task2 <= task3, task1 > 2, task3 < 8
+        scenario += task2 < task3
+        self.assertEqual([str(C) for C in scenario.precs_lax()], ['T1 < T2', 'T2 < T3'])
+        self.assertEqual([str(C) for C in scenario.precs_tight()], ['T2 <= T3'])
+        self.assertEqual([str(C) for C in scenario.bounds_up()], ['T3 < 8'])
+        self.assertEqual(scenario.precs_cond(), [])
+        # querying a base class keeps the order in which constraints were added
+        self.assertEqual([str(C) for C in scenario.constraints(_Precedence)],
+                         ['T1 < T2', 'T2 <= T3', 'T2 < T3'])
+        scenario -= task2
+        self.assertEqual([str(C) for C in scenario.constraints()], ['T1 > 2', 'T3 < 8'])
+        self.assertEqual(scenario.precs_lax(), [])
+
+    def test_resource_task_index(self) -> None:
+        scenario = Scenario('Scenario_10')
+        res1, res2 = scenario.Resource('R1'), scenario.Resource('R2')
+        task1, task2 = scenario.Task('T1'), scenario.Task('T2')
+        task1 += res1 | res2
+        task2 += res1
+        self.assertEqual(scenario.tasks(resource=res1), [task1, task2])
+        self.assertEqual(scenario.tasks(resource=res2), [task1])
+        self.assertEqual(scenario.resources(task=task1), [res1, res2])
+        task1 -= res1 | res2
+        self.assertEqual(scenario.tasks(resource=res1), [task2])
+        self.assertEqual(scenario.tasks(resource=res2), [])
+        task2.resources_req = [res2*1]
+        self.assertEqual(scenario.tasks(resource=res2), [task2])
+        # copies keep their own index
+        scenario_ = copy.deepcopy(scenario)
+        scenario_['T1'] += scenario_['R2']
+        self.assertEqual(scenario.tasks(resource=res2), [task2])
+        self.assertEqual([T.name for T in scenario_.tasks(resource=scenario_['R2'])], ['T2', 'T1'])
+        scenario -= task2
+        self.assertEqual(scenario.tasks(resource=res2), [])
+
+    def test_task_attributes(self) -> None:
+        scenario = Scenario('Scenario_11')
+        task = scenario.Task('T', shift_type=1)
+        task['day'] = 3
+        self.assertEqual(task['shift_type'], 1)
+        self.assertEqual(task.day, 3)
+        self.assertIn('day', task)
+        self.assertNotIn('night', task)
+        self.assertFalse(hasattr(task, 'night'))
+        task_ = pickle.loads(pickle.dumps(scenario))['T']
+        self.assertEqual((task_.length, task_['shift_type'], task_['day']), (1, 1, 3))
+        # tasks get distinct integer ids
+        self.assertNotEqual(hash(task), hash(scenario.Task('T2')))
+
+    def test_bulk_construction(self) -> None:
+        scenario = Scenario('Scenario_12', horizon=10)
+        scenario.Resources('R', num=2)
+        tasks = scenario.add_tasks(['T0', 'T1', 'T2'], lengths=[1, 2, 1], delay_costs=1, shift_type=[1, -1, 1])
+        self.assertEqual([T.length for T in tasks], [1, 2, 1])
+        self.assertEqual(tasks[1]['shift_type'], -1)
+        with self.assertRaises(NameError):
+            scenario.add_tasks(['T3', 'T0'])
+        # periods are given per task or once for all tasks
+        A, B, C = scenario.add_tasks(['A', 'B', 'C'], periods=[range(0, 3), None, (5, 6)])
+        self.assertEqual((A.periods, B.periods, C.periods), ([0, 1, 2], None, [5, 6]))
+        self.assertEqual(scenario.get_mask_periods(scenario.get_period_mask(A)), [0, 1, 2])
+        D, E = scenario.add_tasks(['D', 'E'], periods=range(4))
+        self.assertEqual((D.periods, E.periods), ([0, 1, 2, 3], [0, 1, 2, 3]))
+        with self.assertRaises(Exception):
+            scenario.add_tasks(['F', 'G'], periods=[[0], [1], [2]])
+        # missing periods can be mixed with any periods which Task accepts
+        F, G = scenario.add_tasks(['F', 'G'], periods=[None, 3])
+        self.assertEqual((F.periods, G.periods), (None, scenario.Task('H', periods=3).periods))
+        for T in (A, B, C, D, E, F, G, scenario['H']):
+            scenario -= T
+        # tasks and resources can be given as objects, names or positions
+        scenario.add_resource_reqs([0, 'T1', tasks[2]], [['R0', 'R1'], [0, 1], 'R1'])
+        self.assertEqual([str(T.resources_req) for T in tasks], ['[R0|R1]', '[R0|R1]', '[R1]'])
+        self.assertEqual(scenario.tasks(resource=scenario['R1']), tasks)
+        scenario.add_precedences(['T0', 'T0'], ['T1', 'T2'], offsets=[0, 2])
+        scenario.add_precedences([0], [1], kind='tight')
+        scenario.add_bounds(['T2'], 3, kind='up')
+        self.assertEqual([str(C) for C in scenario.constraints()],
+                         ['T0 < T1', 'T0 + 2 < T2', 'T0 <= T1', 'T2 < 3'])
+
+    @unittest.skipUnless(pd, 'pandas not installed')
+    def test_bulk_construction_from_dataframe(self) -> None:
+        scenario = Scenario('Scenario_13', horizon=10)
+        df = pd.DataFrame({'name': ['T0', 'T1'], 'length': [2, 3], 'color': ['red', 'blue']})
+        tasks = scenario.add_tasks(df)
+        self.assertEqual([T.length for T in tasks], [2, 3])
+        self.assertIsInstance(tasks[0].length, int)
+        self.assertEqual(tasks[1].color, 'blue')
+
+    def test_save_and_load(self) -> None:
+        scenario = Scenario('Scenario_14', horizon=10, start_time=datetime.datetime(2020, 1, 1),
+                            steptime=datetime.timedelta(hours=1))
+        res1, res2 = scenario.Resource('R1', periods=[0, 1, 2]), scenario.Resource('R2', size=2)
+        task1 = scenario.Task('T1', length=2, delay_cost=1, shift_type=1)
+        task2 = scenario.Task('T2', schedule_cost=-1.5, periods=[3, 4])
+        task3 = scenario.Task('T3', group='G')
+        # ranges, tuples and sets are restored with their type
+        task4 = scenario.Task('T4', periods=range(2, 8, 2), shifts=(1, (2, 3)), tags={'a'})
+        res3 = scenario.Resource('R3', periods=(0, 2))
+        RA = res1 | res2
+        task1 += RA
+        task2 += RA, res2*2
+        task3 += res1
+        task3 += task1*[res1, res2]
+        scenario += task1 + 1 < task2, task1*res1 <= task3, task3 > 2, res1['length'][0:5] <= 3
+        scenario += res2['shift_type'][0:3].max <= 1
+        task1.start_value, task1.resources = 0, [res1]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'scenario.pys')
+            scenario.save(path)
+            scenario_ = Scenario.load(path)
+            with ScenarioFile(path) as f:
+                self.assertEqual(len(f), 4)
+                self.assertEqual(f.column('tasks', 'length').tolist(), [2, 1, 1, 1])
+                self.assertEqual(list(f.column('tasks', 'attr.shift_type')), [1, None, None, None])
+        self.assertEqual(str(scenario_), str(scenario))
+        self.assertEqual(scenario_.start_time, scenario.start_time)
+        self.assertEqual(scenario_.steptime, scenario.steptime)
+        self.assertEqual(str(scenario_.solution()), str(scenario.solution()))
+        self.assertEqual([str(C) for C in scenario_.constraints()], [str(C) for C in scenario.constraints()])
+        task1_, task2_ = scenario_['T1'], scenario_['T2']
+        # joint requirements keep sharing the same alternative
+        self.assertIs(task1_.resources_req[0], task2_.resources_req[0])
+        self.assertEqual((task1_.shift_type, task2_.schedule_cost, task2_.periods), (1, -1.5, [3, 4]))
+        self.assertFalse(hasattr(task2_, 'shift_type'))
+        self.assertEqual(scenario_['R1'].periods, [0, 1, 2])
+        self.assertEqual(str(scenario_['T3'].tasks_req), str(task3.tasks_req))
+        task4_ = scenario_['T4']
+        self.assertEqual((task4_.periods, task4_.shifts, task4_.tags), (range(2, 8, 2), (1, (2, 3)), {'a'}))
+        self.assertEqual(scenario_['R3'].periods, (0, 2))
+
+    def test_summary_and_dump(self) -> None:
+        scenario = Scenario('Scenario_17', horizon=5)
+        res = scenario.Resource('R')
+        task1, task2 = scenario.Task('T1', delay_cost=1), scenario.Task('T2', delay_cost=2)
+        task1 += res
+        task2 += res
+        scenario += task1 < task2
+        self.assertEqual(scenario.summary(), 'Scenario_17: 2 tasks, 1 resources, 1 constraints, horizon 5')
+        self.assertEqual(str(scenario.objective()), 'T1+T2*2')
+        report = io.StringIO()
+        scenario.dump(report)
+        self.assertEqual(report.getvalue(), str(scenario))
+        self.assertIn('T1 < T2', report.getvalue())
+
+    def test_fork(self) -> None:
+        scenario = Scenario('Scenario_18', horizon=10)
+        res1, res2 = scenario.Resource('R1'), scenario.Resource('R2')
+        task1, task2, task3 = scenario.Task('T1', delay_cost=1), scenario.Task('T2'), scenario.Task('T3')
+        task1 += res1 | res2
+        task2 += res1
+        task3 += res2
+        scenario += task1 < task2, task3 > 1
+        report = str(scenario)
+        fork = scenario.fork()
+        # the fork hands out views which only get their own state when one side changes
+        self.assertIn(task3, fork)
+        fork['T3'].length = 2
+        self.assertEqual((task3.length, fork['T3'].length), (1, 2))
+        self.assertIsNot(fork['T3'], task3)
+        self.assertIs(fork.bounds_low()[0].task, fork['T3'])
+        # views refer to views of the other elements
+        fork['R1'].size = 2
+        self.assertIs(fork['T1'].resources_req[0][fork['R1']], 1)
+        self.assertEqual(fork.tasks(resource=fork['R1']), [fork['T1'], fork['T2']])
+        fork += fork['T2'] < 5
+        fork -= fork['T3']
+        fork['T1'].start_value, fork['T1'].resources = 0, [fork['R1']]
+        self.assertEqual(str(scenario), report)
+        self.assertEqual(scenario.solution(), [])
+        self.assertEqual(res1.size, 1)
+        self.assertEqual([str(C) for C in fork.constraints()], ['T1 < T2', 'T2 < 5'])
+        self.assertEqual([str(C) for C in scenario.constraints()], ['T1 < T2', 'T3 > 1'])
+        self.assertEqual(str(fork.solution()), '[(T1, R1, 0, 1)]')
+        self.assertEqual([T.name for T in scenario.tasks(resource=res1)], ['T1', 'T2'])
+        for T in fork.tasks():
+            self.assertNotIn(T, scenario)
+        # the bulk api copies shared elements too
+        fork = scenario.fork()
+        fork.add_resource_reqs(['T1'], [['R2']])
+        fork.add_precedences([task2], ['T3'])
+        fork.add_bounds([2], 3)
+        self.assertEqual([str(RA) for RA in task1.resources_req], ['R1|R2'])
+        self.assertEqual([str(RA) for RA in fork['T1'].resources_req], ['R1|R2', 'R2'])
+        for C in fork.constraints():
+            for T in C.tasks():
+                self.assertIs(T, fork[T.name])
+        self.assertEqual([str(C) for C in scenario.constraints()], ['T1 < T2', 'T3 > 1'])
+        # forks keep their own period masks
+        scenario.get_period_mask(task2)
+        fork.horizon = 5
+        self.assertEqual(fork.get_period_mask(fork['T2']), 0b11111)
+        self.assertEqual(scenario.get_period_mask(task2), (1 << 10)-1)
+        # changes of the scenario after forking do not show up in the fork
+        fork = scenario.fork()
+        tasks = fork.tasks()
+        task1.length = 3
+        task2 += res2
+        res2.size = 4
+        self.assertEqual([T.length for T in tasks], [1, 1, 1])
+        self.assertEqual([str(RA) for RA in fork['T2'].resources_req], ['R1'])
+        self.assertEqual(fork['R2'].size, 1)
+        self.assertEqual([T.name for T in fork.tasks(resource=fork['R2'])], ['T1', 'T3'])
+        self.assertEqual([T.name for T in scenario.tasks(resource=res2)], ['T1', 'T3', 'T2'])
+        fork['T1'] += fork['R2']
+        self.assertEqual([str(RA) for RA in task1.resources_req], ['R1|R2'])
+        # forks of forks and copies of forks
+        fork2 = fork.fork()
+        fork2['T3'].length = 5
+        self.assertEqual((task3.length, fork['T3'].length, fork2['T3'].length), (1, 1, 5))
+        fork3 = copy.deepcopy(fork2)
+        self.assertEqual([T.length for T in fork3.tasks()], [1, 1, 5])
+        self.assertEqual([str(RA) for RA in fork3['T1'].resources_req], ['R1|R2', 'R2'])
+
+    def test_fork_views(self) -> None:
+        scenario = Scenario('Scenario_34', horizon=10)
+        resources = [ scenario.Resource('R%i'%i) for i in range(3) ]
+        tasks = scenario.add_tasks([ 'T%i'%i for i in range(100) ], lengths=2)
+        scenario.add_resource_reqs(tasks, [ resources ]*100)
+        fork = scenario.fork()
+        # reading from the fork does not copy the state of the tasks
+        for T in fork.tasks():
+            self.assertEqual(T.length, 2)
+            self.assertRaises(AttributeError, object.__getattribute__, T, '_resources_req')
+        # tasks added to a resource in the fork show up in its index
+        fork['T0'].resources_req = [ fork['R1']*1 ]
+        self.assertEqual(len(fork.tasks(resource=fork['R0'])), 99)
+        self.assertEqual(len(scenario.tasks(resource=resources[0])), 100)
+        task = fork.Task('T100')
+        task += fork['R0']
+        self.assertEqual(fork.tasks(resource=resources[0])[-1], task)
+        self.assertNotIn(task, scenario)
+
+    def test_period_mask(self) -> None:
+        scenario = Scenario('Scenario_20', horizon=6)
+        res = scenario.Resource('R', periods=[1, 2, 3])
+        task = scenario.Task('T')
+        self.assertEqual(list(scenario.get_periods(task)), [0, 1, 2, 3, 4, 5])
+        self.assertEqual(scenario.get_period_mask(task), 0b111111)
+        self.assertEqual(scenario.get_mask_periods(scenario.get_period_mask(task) & scenario.get_period_mask(res)),
+                         [1, 2, 3])
+        # masks follow changes of the periods
+        task.periods = [0, 2]
+        self.assertEqual(scenario.get_mask_periods(scenario.get_period_mask(task)), [0, 2])
+        task.periods.append(5)
+        self.assertEqual(scenario.get_mask_periods(scenario.get_period_mask(task)), [0, 2, 5])
+
+    def test_time_windows(self) -> None:
+        scenario = Scenario('Scenario_21', horizon=20)
+        res = scenario.Resource('R', periods=list(range(2, 20)))
+        tasks = scenario.Tasks('T', num=4, length=2)
+        tasks += res
+        optional = scenario.Task('O', length=2, schedule_cost=1)
+        optional += res
+        scenario += tasks[0] < tasks[1], tasks[1] + 1 < tasks[2], tasks[2] <= tasks[3]
+        scenario += optional < tasks[0], tasks[3] < 18
+        windows = scenario.get_time_windows()
+        self.assertEqual(windows[tasks[0]], (2, 9))
+        self.assertEqual(windows[tasks[1]], (4, 11))
+        self.assertEqual(windows[tasks[2]], (7, 14))
+        self.assertEqual(windows[tasks[3]], (9, 16))
+        # precedences with optional tasks do not restrict the windows
+        self.assertEqual(windows[optional], (2, 19))
+        self.assertEqual(scenario.get_time_windows(periods=False)[tasks[0]], (0, 9))
+        self.assertTrue(solvers.mip.solve(scenario, msg=0))
+
+    def test_time_windows_chain(self) -> None:
+        # latest starts travel back along the whole chain in a single round
+        n = 5000
+        scenario = Scenario('Scenario_27', horizon=3*n)
+        tasks = scenario.add_tasks(['T%i' % i for i in range(n)], lengths=2)
+        scenario.add_precedences(tasks[:-1], tasks[1:])
+        start = time.perf_counter()
+        windows = scenario.get_time_windows(periods=False)
+        self.assertLess(time.perf_counter()-start, 5)
+        self.assertEqual(windows[tasks[0]], (0, n+1))
+        self.assertEqual(windows[tasks[-1]], (2*n-2, 3*n-1))
+
+    def test_precedence_graph(self) -> None:
+        scenario = Scenario('Scenario_22', horizon=20)
+        res = scenario.Resource('R')
+        A, B, C, D = scenario.Tasks('T', num=4, length=2)
+        scenario += A < B, B + 1 < C, A < C, C <= D
+        for T in (A, B, C, D):
+            T += res
+        self.assertEqual(scenario.precedence_order(), [A, B, C, D])
+        self.assertEqual(scenario.transitive_reduction(), [(A, B), (B, C), (C, D)])
+        self.assertEqual(scenario.critical_path(), (9, [A, B, C, D]))
+        # the graph follows added and removed constraints
+        E = scenario.Task('E', length=5)
+        E += res
+        scenario += E < B
+        self.assertEqual(scenario.critical_path(), (12, [E, B, C, D]))
+        scenario -= E
+        self.assertEqual(scenario.critical_path(), (9, [A, B, C, D]))
+        self.assertIsNone(scenario.precedence_cycle())
+        scenario += D < A
+        self.assertIn(scenario.precedence_cycle(), ([A, B, C, D], [A, C, D]))
+        with self.assertRaises(Exception):
+            scenario.check()
+
+    def test_tighten_horizon(self) -> None:
+        scenario = Scenario('Scenario_23', horizon=100)
+        R1, R2 = scenario.Resource('R1'), scenario.Resource('R2')
+        A, B, C = scenario.Tasks('T', num=3, length=2)
+        A += R1
+        B += R1 | R2
+        C += R2
+        scenario += A < C, B > 1
+        scenario.use_makespan_objective()
+        self.assertTrue(solvers.mip.solve(scenario, msg=0, tighten_horizon=True))
+        self.assertEqual(scenario.horizon, 100)
+        self.assertEqual(scenario['MakeSpan'].start_value, 4)
+        self.assertEqual(scenario.tighten_horizon(), 6)
+        self.assertEqual(scenario.horizon, 100)
+        self.assertEqual(scenario.tighten_horizon(apply=True), 6)
+        self.assertEqual(scenario.horizon, 6)
+        # capacities are not supported by the greedy schedule
+        scenario = Scenario('Scenario_24', horizon=100)
+        R = scenario.Resource('R')
+        T = scenario.Task('T')
+        T += R
+        scenario += R['length'][:10] <= 1
+        self.assertEqual(scenario.tighten_horizon(), 100)
+
+    def test_time_scale(self) -> None:
+        scenario = Scenario('Scenario_25', horizon=120)
+        R = scenario.Resource('R', periods=list(range(0, 60)) + list(range(90, 120)))
+        A = scenario.Task('A', length=30, delay_cost=1)
+        B = scenario.Task('B', length=60, delay_cost=1)
+        C = scenario.Task('C', length=30, delay_cost=2)
+        for T in (A, B, C):
+            T += R
+        scenario += A + 30 < C, B > 30
+        self.assertEqual(solvers.timescale.time_scale(scenario), 30)
+        self.assertTrue(solvers.timescale.solve(scenario, solvers.mip.solve))
+        self.assertEqual(scenario.solution(),
+                         [(A, R, 0, 30), (B, R, 30, 90), (C, R, 90, 120)])
+        # the scenario is not changed
+        self.assertEqual((A.length, B.length, scenario.horizon), (30, 60, 120))
+        self.assertEqual(str(scenario.precs_lax()[0]), 'A + 30 < C')
+        scenario += A < B
+        self.assertEqual(solvers.timescale.time_scale(scenario), 30)
+        B.length = 45
+        self.assertEqual(solvers.timescale.time_scale(scenario), 15)
+
+    def test_symmetries(self) -> None:
+        def scenario_():
+            scenario = Scenario('Scenario_26', horizon=20)
+            R = scenario.Resources('R', num=2)
+            tasks = scenario.Tasks('T', num=4, length=3, delay_cost=1)
+            tasks += R[0] | R[1]
+            D = scenario.Task('D', length=2, delay_cost=1)
+            D += R[0]
+            scenario += tasks[0] > 2, tasks[1] > 2, tasks[2] < D
+            return scenario
+        scenario = scenario_()
+        self.assertEqual([[str(T) for T in tasks] for tasks in solvers.symmetry.task_classes(scenario)],
+                         [['T0', 'T1']])
+        # R0 is required by D alone
+        self.assertEqual(solvers.symmetry.resource_classes(scenario), [])
+        scenario -= scenario['D']
+        self.assertEqual([[str(T) for T in tasks] for tasks in solvers.symmetry.task_classes(scenario)],
+                         [['T0', 'T1'], ['T2', 'T3']])
+        self.assertEqual([[str(R) for R in resources] for resources in solvers.symmetry.resource_classes(scenario)],
+                         [['R0', 'R1']])
+        for solve in (solvers.mip.solve, solvers.mip_bigm.solve):
+            objectives = list()
+            for symmetries in (False, True):
+                scenario = scenario_()
+                self.assertTrue(solve(scenario, msg=0, symmetries=symmetries))
+                objectives.append(sum(T.start_value+T.length for T in scenario.tasks()))
+            self.assertEqual(objectives[0], objectives[1])
+
+    def test_resource_groups(self) -> None:
+        def scenario_(is_group):
+            scenario = Scenario('Scenario_27', horizon=12)
+            R = scenario.Resources('R', num=3, is_group=is_group)
+            W = scenario.Resource('W')
+            tasks = [scenario.Task('T%i' % i, length=1+i % 3, delay_cost=1) for i in range(7)]
+            for T in tasks:
+                T += R[0] | R[1] | R[2]
+            tasks[0] += W
+            tasks[1] += W
+            scenario += tasks[2] < tasks[3]
+            return scenario
+        scenario = scenario_(True)
+        self.assertEqual([[str(R) for R in resources] for resources in
+                          solvers.mip._get_resource_groups(scenario).values()], [['R0', 'R1', 'R2']])
+        objectives = list()
+        for is_group in (False, True):
+            scenario = scenario_(is_group)
+            self.assertTrue(solvers.mip.solve(scenario, msg=0))
+            objectives.append(sum(T.start_value for T in scenario.tasks()))
+            # the aggregated resource is distributed without overlaps
+            for R in scenario.resources():
+                starts = sorted((T.start_value, T.start_value+T.length) for T in scenario.tasks()
+                                if R in T.resources)
+                self.assertTrue(all(end <= start for (_, end), (start, _) in zip(starts, starts[1:])))
+        self.assertEqual(objectives[0], objectives[1])
+
+    def test_cumulative_precs(self) -> None:
+        objectives = list()
+        for cumulative_precs in (False, True):
+            scenario = Scenario('Scenario_29', horizon=20)
+            R = scenario.Resources('R', num=2)
+            tasks = scenario.Tasks('T', num=5, length=2, delay_cost=1)
+            tasks += R[0] | R[1]
+            group = scenario.Tasks('G', num=2, is_group=True, delay_cost=1)
+            group += R[1]
+            scenario += tasks[0] < tasks[1], tasks[1] + 1 < tasks[2], tasks[2]*R[0] < tasks[3]
+            scenario += tasks[3] < tasks[4]*R[1], group[0] < tasks[0]
+            self.assertTrue(solvers.mip.solve(scenario, msg=0, cumulative_precs=cumulative_precs))
+            objectives.append(sum(T.start_value for T in scenario.tasks()))
+        self.assertEqual(objectives[0], objectives[1])
+
+    def test_cumulative_precs_cond(self) -> None:
+        objectives = list()
+        for cumulative_precs_cond in (False, True):
+            scenario = Scenario('Scenario_30', horizon=20)
+            R = scenario.Resources('R', num=2)
+            tasks = [scenario.Task('T%i' % i, length=1+i % 3, delay_cost=1+i % 2) for i in range(5)]
+            for T in tasks:
+                T += R[0] | R[1]
+            group = scenario.Tasks('G', num=2, is_group=True, length=2, delay_cost=1)
+            group += R[0] | R[1]
+            scenario += tasks[0] + 2 << tasks[1], tasks[2] << tasks[1], tasks[3] + 1 << tasks[4]
+            scenario += group[0] + 1 << tasks[0], tasks[4] << group[0]
+            self.assertTrue(solvers.mip.solve(scenario, msg=0, cumulative_precs_cond=cumulative_precs_cond))
+            objectives.append(sum(T.delay_cost*T.start_value for T in scenario.tasks()))
+        self.assertEqual(objectives[0], objectives[1])
+
+    def test_cumulative_precs_both(self) -> None:
+        objectives = list()
+        for cumulative in (False, True):
+            scenario = Scenario('Scenario_35', horizon=12)
+            R = scenario.Resources('R', num=2)
+            tasks = scenario.Tasks('T', num=4, length=2, delay_cost=1)
+            tasks += R[0] | R[1]
+            # both kinds of counts of T0 on R0
+            scenario += tasks[0]*R[0] < tasks[2], tasks[0] << tasks[1], tasks[3] < tasks[0]
+            self.assertTrue(solvers.mip.solve(scenario, msg=0, cumulative_precs=cumulative,
+                                              cumulative_precs_cond=cumulative))
+            objectives.append(sum(T.start_value for T in scenario.tasks()))
+        self.assertEqual(objectives[0], objectives[1])
+
+    def test_bound_domains(self) -> None:
+        def scenario_():
+            scenario = Scenario('Scenario_31', horizon=10)
+            R = scenario.Resource('R')
+            tasks = scenario.Tasks('T', num=4, length=2, delay_cost=1)
+            tasks += R
+            scenario += tasks[0] > 3, tasks[1] < 4, tasks[2] >= 5, tasks[3] <= 9
+            return scenario
+        scenario = scenario_()
+        model = solvers.mip.DiscreteMIP(solvers.mip_pulp.MIP('Scenario_31'))
+        model.scenario, model.horizon = scenario, scenario.horizon
+        model.build_mip_from_scenario()
+        # bounds only restrict the variables
+        self.assertEqual([t for (T, t) in (key for key in model.x if len(key) == 2) if T.name == 'T0'],
+                         list(range(3, 10)))
+        self.assertEqual(len(model.mip.mip.constraints), 4+10)
+        for solve in (solvers.mip.solve, solvers.mip_bigm.solve):
+            scenario = scenario_()
+            self.assertTrue(solve(scenario, msg=0))
+            self.assertEqual([T.start_value for T in scenario.tasks()], [3, 0, 5, 7])
+
+    def test_empty_windows(self) -> None:
+        for solve in (solvers.mip.solve, solvers.mip_bigm.solve):
+            scenario = Scenario('Scenario_36', horizon=10)
+            R = scenario.Resource('R')
+            tasks = scenario.Tasks('T', num=2, delay_cost=1)
+            tasks += R
+            scenario += tasks[0] <= tasks[1], tasks[0] + 1 < tasks[1]
+            # the precedences form a cycle of positive length
+            self.assertTrue(any(earliest > latest for earliest, latest in
+                                scenario.get_time_windows(periods=False).values()))
+            self.assertEqual(solve(scenario, msg=0), 0)
+
+    @unittest.skipUnless(np, 'numpy not installed')
+    def test_array_model(self) -> None:
+        def scenario_():
+            scenario = Scenario('Scenario_32', horizon=20)
+            R = scenario.Resources('R', num=2)
+            tasks = [scenario.Task('T%i' % i, length=1+i % 3, delay_cost=1+i % 2) for i in range(6)]
+            for T in tasks:
+                T += R[0] | R[1]
+            scenario += tasks[0] < tasks[1], tasks[2]*R[0] < tasks[3], tasks[4] > 3
+            return scenario
+        objectives = list()
+        for array_model in (False, True):
+            scenario = scenario_()
+            self.assertTrue(solvers.mip.solve(scenario, msg=0, array_model=array_model))
+            objectives.append(sum(T.delay_cost*T.start_value for T in scenario.tasks()))
+            self.assertTrue(all(T.resources for T in scenario.tasks()))
+        self.assertEqual(objectives[0], objectives[1])
+        model = solvers.mip.DiscreteMIP(solvers.mip_array.MIP('Scenario_32'))
+        model.scenario, model.horizon = scenario, scenario.horizon
+        model.build_mip_from_scenario()
+        rows, cols, coeffs = model.mip.matrix()
+        self.assertEqual(len(rows), len(model.mip.coeffs))
+        self.assertTrue((cols[1:] >= cols[:-1]).all())
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'model.mps')
+            model.mip.write_mps(path)
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[-1], 'ENDATA')
+        self.assertEqual(sum(1 for line in lines if line.startswith(' E ') or line.startswith(' L ')),
+                         len(model.mip.row_low))
+
+    @unittest.skipUnless(highspy, 'highspy not installed')
+    def test_highs(self) -> None:
+        def scenario_():
+            scenario = Scenario('Scenario_33', horizon=20)
+            R = scenario.Resources('R', num=2)
+            tasks = [scenario.Task('T%i' % i, length=1+i % 3, delay_cost=1+i % 2) for i in range(5)]
+            for T in tasks:
+                T += R[0] | R[1]
+            scenario += tasks[0] < tasks[1], tasks[2] > 3
+            return scenario
+        for solve in (solvers.mip.solve, solvers.mip_bigm.solve):
+            objectives = list()
+            for kind in ('CBC', 'HIGHS'):
+                scenario = scenario_()
+                solutions = list()
+                self.assertTrue(solve(scenario, kind=kind, msg=0, threads=1, callback=solutions.append))
+                objectives.append(sum(T.delay_cost*T.start_value for T in scenario.tasks()))
+            self.assertEqual(objectives[0], objectives[1])
+            # the callback gets the objective of each new solution
+            self.assertEqual(round(solutions[-1]), objectives[1])
+        # the callback can stop the solver after the first solution
+        scenario = scenario_()
+        self.assertTrue(solvers.mip.solve(scenario, kind='HIGHS', msg=0, callback=lambda objective: True))
+        # the solution of the scenario is a mip start
+        solution = [T.start_value for T in scenario.tasks()]
+        self.assertTrue(solvers.mip.solve(scenario, kind='HIGHS', msg=0, time_limit=0, warm_start=True))
+        self.assertEqual([T.start_value for T in scenario.tasks()], solution)
+
+    def test_scip_readsol(self) -> None:
+        from pyschedule.solvers.pulp_scip import SCIP_CMD
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'pulp.sol')
+            with open(path, 'w') as f:
+                f.write('solution status: optimal solution found\nobjective value: 3\n'
+                        'x_1 1 \t(obj:0)\nx_2 0 \t(obj:0)\ny 2.5 \t(obj:1)\n\n')
+            status, values = SCIP_CMD().readsol(path)
+        self.assertEqual(status, 1)
+        self.assertEqual(values, {'x_1': 1.0, 'y': 2.5})
+        self.assertTrue(os.access(SCIP_CMD().ramDir(), os.W_OK))
+
+    def test_decompose(self) -> None:
+        scenario = Scenario('Scenario_28', horizon=20)
+        for i in range(3):
+            R = scenario.Resources('R%i_' % i, num=2)
+            tasks = scenario.Tasks('T%i_' % i, num=4, length=2, delay_cost=1)
+            tasks += R[0] | R[1]
+            scenario += tasks[0] < tasks[1]
+        task = scenario.Task('U', delay_cost=1)
+        task += scenario.Resource('W')
+        self.assertEqual([[str(el) for el in elements] for elements in solvers.decompose.components(scenario)][0],
+                         ['T0_0', 'T0_1', 'T0_2', 'T0_3', 'R0_0', 'R0_1', 'T0_0 < T0_1'])
+        self.assertEqual(len(solvers.decompose.components(scenario)), 4)
+        self.assertTrue(solvers.decompose.solve(scenario, solvers.mip.solve, processes=2))
+        self.assertEqual(sum(T.start_value for T in scenario.tasks()), 3*4)
+        for i in range(3):
+            self.assertEqual({str(R) for T in scenario.tasks() if T.name.startswith('T%i_' % i) for R in T.resources},
+                             {'R%i_0' % i, 'R%i_1' % i})
+        # resources are mapped back to the resources of the scenario
+        R = scenario['T0_0'].resources[0]
+        self.assertIs(R, scenario[R.name])
+        # a capacity constraint of a resource without tasks
+        scenario += scenario.Resource('V')['length'][0:5] <= 2
+        self.assertEqual([str(el) for el in solvers.decompose.components(scenario)[-1]],
+                         ['V', "V['length'][0:5] <= 2"])
+        self.assertTrue(solvers.decompose.solve(scenario, solvers.mip.solve, processes=1))
+
+    def test_slice_weight(self) -> None:
+        scenario = Scenario('Scenario_19', horizon=10)
+        res = scenario.Resource('R')
+        task = scenario.Task('T', length=4, size=2)
+        self.assertEqual([res['size'][2:5].weight(task, t) for t in range(-2, 6)],
+                         [0, 0.5, 1.0, 1.5, 1.5, 1.0, 0.5, 0])
+        self.assertEqual(res['size'].weight(task, 3), 2)
+        self.assertEqual(res['colour'][0:5].weight(task, 0), 0)
+
+    @unittest.skipUnless(np, 'numpy not installed')
+    def test_solution_array(self) -> None:
+        scenario = Scenario('Scenario_15', horizon=10, start_time=datetime.datetime(2020, 1, 1),
+                            steptime=datetime.timedelta(minutes=30))
+        res1, res2 = scenario.Resource('R1'), scenario.Resource('R2')
+        task1, task2, task3 = scenario.Task('T1', length=2), scenario.Task('T2'), scenario.Task('T3')
+        task1.start_value, task1.resources = 3, [res2, res1]
+        task2.start_value, task2.resources = 0, [res2]
+        task3.start_value, task3.resources = 3, [res1]
+        solution = scenario.solution_array(datetimes=True)
+        self.assertEqual([(T, R, x, y) for T, R, x, y in scenario.solution()],
+                         [(scenario.tasks()[T], scenario.resources()[R], x, y)
+                          for T, R, x, y in solution[['task', 'resource', 'start', 'end']].tolist()])
+        self.assertEqual(solution['end_time'][-1], np.datetime64('2020-01-01T02:00'))
+        with self.assertRaises(Exception):
+            Scenario('Scenario_16').solution_array(datetimes=True)
+        if pd is not None:
+            df = scenario.solution_frame()
+            self.assertEqual(list(df['task'].astype(str)), ['T2', 'T1', 'T1', 'T3'])
+            self.assertEqual(list(df['resource'].cat.codes), [1, 0, 1, 0])
+
 if __name__ == "__main__":
     unittest.main()